@@ -0,0 +1,187 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+# Histogram bins per feature (plus one underflow and one overflow bin)
+DEFAULT_N_BINS = 20
+
+# PSI rule of thumb: < 0.1 stable, 0.1 - 0.2 moderate shift, > 0.2 significant drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.2
+
+# Floor for empty bins so PSI stays finite
+PSI_EPSILON = 1e-4
+
+# Fewer observed rows than this are reported but not flagged (PSI is noisy on tiny samples)
+MIN_OBSERVATIONS = 100
+
+def create_baseline_sketch(X, feature_names, n_bins=DEFAULT_N_BINS):
+    """
+    Builds the training time baseline: bin edges at the training quantiles of each feature plus the counts
+    The edges are then reused by every later sketch so sketches can be merged by adding counts
+    """
+    X = np.asarray(X, dtype=np.float64)
+    quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+
+    features = {}
+    for j, name in enumerate(feature_names):
+        values = X[:, j][~np.isnan(X[:, j])]
+        edges = np.unique(np.quantile(values, quantiles)) if len(values) else np.array([])
+        features[name] = {'edges': edges.tolist(), 'counts': [0] * (len(edges) + 1), 'missing': 0}
+
+    sketch = {'n_bins': n_bins, 'n_rows': 0, 'features': features}
+    return update_sketch(sketch, X, feature_names)
+
+def empty_sketch_like(baseline):
+    """
+    Zero count sketch that shares the baseline bin edges
+    """
+    return {
+        'n_bins': baseline['n_bins'],
+        'n_rows': 0,
+        'features': {
+            name: {'edges': list(feature['edges']), 'counts': [0] * len(feature['counts']), 'missing': 0}
+            for name, feature in baseline['features'].items()
+        }
+    }
+
+def update_sketch(sketch, X, feature_names):
+    """
+    Adds a batch of raw (unscaled) feature rows to a sketch in place
+    One searchsorted + bincount per feature, so memory stays fixed no matter how many rows are seen
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+
+    for j, name in enumerate(feature_names):
+        feature = sketch['features'].get(name)
+        if feature is None:
+            continue
+        values = X[:, j]
+        missing = np.isnan(values)
+        bins = np.searchsorted(np.asarray(feature['edges']), values[~missing], side='right')
+        counts = np.asarray(feature['counts'], dtype=np.int64) + np.bincount(bins, minlength=len(feature['counts']))
+        feature['counts'] = counts.tolist()
+        feature['missing'] += int(missing.sum())
+
+    sketch['n_rows'] += len(X)
+    return sketch
+
+def merge_sketches(*sketches):
+    """
+    Combines sketches built on the same baseline edges (counts add up exactly)
+    """
+    merged = empty_sketch_like(sketches[0])
+    for sketch in sketches:
+        for name, feature in sketch['features'].items():
+            target = merged['features'][name]
+            if feature['edges'] != target['edges']:
+                raise ValueError(f"Sketch bin edges for {name} do not match the baseline")
+            target['counts'] = (np.asarray(target['counts']) + np.asarray(feature['counts'])).tolist()
+            target['missing'] += feature['missing']
+        merged['n_rows'] += sketch['n_rows']
+    return merged
+
+def _psi_ks(baseline_counts, current_counts):
+    # PSI over the shared bins and KS as the largest gap between the binned CDFs
+    baseline_counts = np.asarray(baseline_counts, dtype=np.float64)
+    current_counts = np.asarray(current_counts, dtype=np.float64)
+    if baseline_counts.sum() == 0 or current_counts.sum() == 0:
+        return np.nan, np.nan
+
+    expected = baseline_counts / baseline_counts.sum()
+    actual = current_counts / current_counts.sum()
+
+    expected_floor = np.maximum(expected, PSI_EPSILON)
+    actual_floor = np.maximum(actual, PSI_EPSILON)
+    psi = float(np.sum((actual_floor - expected_floor) * np.log(actual_floor / expected_floor)))
+    ks = float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+    return psi, ks
+
+def drift_report(baseline, current):
+    """
+    PSI and (binned) KS statistic of every feature in current against the baseline sketch
+    """
+    rows = []
+    for name, feature in baseline['features'].items():
+        current_feature = current['features'].get(name)
+        if current_feature is None:
+            continue
+        psi, ks = _psi_ks(feature['counts'], current_feature['counts'])
+        rows.append({
+            'feature': name,
+            'psi': psi,
+            'ks': ks,
+            'n_observed': int(np.sum(current_feature['counts'])),
+            'missing': current_feature['missing']
+        })
+
+    report = pd.DataFrame(rows)
+    if report.empty:
+        return report
+    report['status'] = np.select(
+        [report['n_observed'] < MIN_OBSERVATIONS, report['psi'] >= PSI_DRIFT, report['psi'] >= PSI_MODERATE],
+        ['insufficient_data', 'drift', 'moderate'],
+        default='stable'
+    )
+    return report.sort_values('psi', ascending=False).reset_index(drop=True)
+
+def batch_and_running_report(baseline, running, batch):
+    """
+    Drift of the latest batch next to drift of the running sketch (batch_ columns)
+    The running sketch covers all history, so a recent shift shows up in the batch columns first
+    """
+    report = drift_report(baseline, running)
+    batch_report = drift_report(baseline, batch).reindex(columns=['feature', 'psi', 'ks', 'n_observed', 'status'])
+    batch_report.columns = ['feature'] + [f'batch_{col}' for col in batch_report.columns[1:]]
+    if report.empty:
+        return report
+    return report.merge(batch_report, on='feature', how='left')
+
+def save_sketch(sketch, path):
+    """
+    Saves a sketch as JSON
+    """
+    with open(path, 'w') as f:
+        json.dump(sketch, f)
+
+def load_sketch(path):
+    """
+    Loads a sketch saved with save_sketch
+    """
+    with open(path) as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    # Training like baseline and a shifted nightly batch for 34 features
+    rng = np.random.default_rng(5)
+    feature_names = [f'feature_{i}' for i in range(34)]
+    X_train = rng.normal(size=(60_000, 34))
+
+    baseline = create_baseline_sketch(X_train, feature_names)
+
+    current = empty_sketch_like(baseline)
+    batch_seconds = []
+    for night in range(30):
+        batch = rng.normal(size=(450, 34))
+        batch[:, 0] += 0.5   # Shifted mean
+        batch[:, 1] *= 1.8   # Wider spread
+        start = time.perf_counter()
+        batch_sketch = update_sketch(empty_sketch_like(baseline), batch, feature_names)
+        current = merge_sketches(current, batch_sketch)
+        report = batch_and_running_report(baseline, current, batch_sketch)
+        batch_seconds.append(time.perf_counter() - start)
+
+    print(f"Sketch update + merge + PSI/KS per batch: {np.mean(batch_seconds) * 1000:.1f} ms")
+    print(f"Sketch size: {len(json.dumps(current)) / 1024:.1f} KB after {current['n_rows']:,} rows")
+    print(report.head(5).round(3).to_string(index=False))
+
+    # A shift in the latest batch only: diluted in the running sketch, obvious in the batch columns
+    batch = rng.normal(size=(450, 34))
+    batch[:, 2] += 1.0
+    batch_sketch = update_sketch(empty_sketch_like(baseline), batch, feature_names)
+    report = batch_and_running_report(baseline, merge_sketches(current, batch_sketch), batch_sketch)
+    print(report[report['feature'] == 'feature_2'].round(3).to_string(index=False))
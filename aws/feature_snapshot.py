@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Feature values are stored as little endian float32, one fixed width row per player
+SNAPSHOT_DTYPE = '<f4'
+
+# Optional per player columns kept in the index next to the ids
+INFO_COLUMNS = ['player_name', 'position']
+
+def snapshot_paths(prefix):
+    """
+    (binary feature file, id index) paths for a snapshot prefix
+    """
+    return f'{prefix}.bin', f'{prefix}.index.json'
+
+def build_feature_snapshot(player_data, selected_features, prefix, id_column='player_id', date_column='game_date'):
+    """
+    Writes every player's most recent selected feature vector to prefix.bin (rows sorted by player id)
+    and the sorted ids, feature names, as of dates, player info and a checksum of the binary file to
+    prefix.index.json (so the index alone changes whenever the snapshot does)
+    Non finite values become 0 like clean_dataset in 02_feature_engineering
+    Returns the index dictionary
+    """
+    latest = player_data.sort_values([id_column, date_column]).drop_duplicates(id_column, keep='last')
+    player_ids = latest[id_column].to_numpy().astype(np.int64)
+    order = np.argsort(player_ids, kind='stable')
+    latest = latest.iloc[order]
+
+    X = latest[selected_features].to_numpy(dtype=np.float64)
+    X = np.where(np.isfinite(X), X, 0).astype(SNAPSHOT_DTYPE)
+
+    index = {
+        'features': list(selected_features),
+        'dtype': SNAPSHOT_DTYPE,
+        'player_ids': player_ids[order].tolist(),
+        'as_of': latest[date_column].astype(str).str[:10].tolist(),
+        'checksum': hashlib.sha256(X.tobytes()).hexdigest()
+    }
+    for col in INFO_COLUMNS:
+        if col in latest.columns:
+            index[col] = latest[col].astype(str).tolist()
+
+    bin_path, index_path = snapshot_paths(prefix)
+    os.makedirs(os.path.dirname(bin_path) or '.', exist_ok=True)
+    X.tofile(bin_path)
+    with open(index_path, 'w') as f:
+        json.dump(index, f)
+
+    return index
+
+def open_feature_snapshot(prefix):
+    """
+    Memory maps a snapshot written by build_feature_snapshot (feature rows are only read when looked up)
+    """
+    bin_path, index_path = snapshot_paths(prefix)
+    with open(index_path) as f:
+        index = json.load(f)
+
+    n_players, n_features = len(index['player_ids']), len(index['features'])
+    if n_players:
+        features = np.memmap(bin_path, dtype=index['dtype'], mode='r', shape=(n_players, n_features))
+    else:
+        features = np.empty((0, n_features), dtype=index['dtype'])
+
+    snapshot = dict(index)
+    snapshot['player_ids'] = np.asarray(index['player_ids'], dtype=np.int64)
+    snapshot['matrix'] = features
+    return snapshot
+
+def lookup_players(snapshot, player_ids, selected_features=None):
+    """
+    Binary searches the sorted id index for each requested player and reads only their rows
+    Columns are reordered to selected_features when given
+    Returns (snapshot row positions, float64 feature matrix, requested ids not in the snapshot)
+    """
+    requested = np.asarray([int(player_id) for player_id in player_ids], dtype=np.int64)
+    ids = snapshot['player_ids']
+
+    positions = np.searchsorted(ids, requested)
+    found = positions < len(ids)
+    found[found] = ids[positions[found]] == requested[found]
+    rows = positions[found]
+
+    X = np.asarray(snapshot['matrix'][rows], dtype=np.float64)
+    if selected_features is not None and list(selected_features) != snapshot['features']:
+        column = {name: j for j, name in enumerate(snapshot['features'])}
+        missing_features = [name for name in selected_features if name not in column]
+        if missing_features:
+            raise ValueError(f"Feature snapshot is missing features: {missing_features}")
+        X = X[:, [column[name] for name in selected_features]]
+
+    return rows, X, requested[~found].tolist()
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    # Two seasons of player-games for a 500 player league, 34 selected features
+    rng = np.random.default_rng(8)
+    n_players, n_rows = 500, 120_000
+    selected_features = [f'feature_{i}' for i in range(34)]
+    player_ids = rng.choice(np.arange(1_000, 1_700_000), n_players, replace=False)
+    player_data = pd.DataFrame(rng.normal(size=(n_rows, 34)), columns=selected_features)
+    player_data.insert(0, 'player_id', rng.choice(player_ids, n_rows))
+    player_data.insert(1, 'game_date', pd.Timestamp('2022-10-18') + pd.to_timedelta(rng.integers(0, 600, n_rows), unit='D'))
+
+    prefix = os.path.join(tempfile.mkdtemp(), 'player_feature_snapshot')
+    start = time.perf_counter()
+    build_feature_snapshot(player_data, selected_features, prefix)
+    print(f"Snapshot built in {time.perf_counter() - start:.3f}s "
+          f"({os.path.getsize(snapshot_paths(prefix)[0]) / 1024:.0f} KB binary)")
+
+    snapshot = open_feature_snapshot(prefix)
+    requested = list(rng.choice(player_ids, 5, replace=False)) + [42]
+
+    n_lookups = 10_000
+    start = time.perf_counter()
+    for _ in range(n_lookups):
+        rows, X, missing = lookup_players(snapshot, requested, selected_features)
+    print(f"Lookup of {len(requested)} players: {(time.perf_counter() - start) / n_lookups * 1e6:.1f} us, "
+          f"missing {missing}")
+
+    # Checks the rows against the latest game of each player
+    latest = player_data.sort_values('game_date').groupby('player_id').tail(1).set_index('player_id')
+    expected = latest.loc[snapshot['player_ids'][rows], selected_features].to_numpy()
+    print(f"Max abs difference vs latest rows: {np.abs(X - expected).max():.2e}")
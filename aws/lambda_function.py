@@ -5,12 +5,62 @@ import pandas as pd
 import numpy as np
 from io import BytesIO
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+from feature_drift import batch_and_running_report, empty_sketch_like, merge_sketches, update_sketch
+from feature_snapshot import lookup_players, open_feature_snapshot, snapshot_paths
+from tableau_extracts import partition_key, snapshot_extracts
+
 # Sets up logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# S3 locations of model artifacts and the rescoring fingerprint index
+MODEL_KEY = 'models/xgboost_20250820_161828.pkl'
+SCALER_KEY = 'models/nba_injury_predictor_v1_scaler.pkl'
+FEATURES_KEY = 'models/selected_features.pkl'
+FINGERPRINT_INDEX_KEY = 'predictions/fingerprint_index.csv'
+
+# Unpickled artifacts (models, scaler, selected features) kept across warm invocations as {key: (ETag, object)}
+_artifact_cache = {}
+
+# Training time feature baseline (exported by 03_modeling) and the running sketch of served features
+DRIFT_BASELINE_KEY = 'models/nba_injury_predictor_v1_feature_baseline.json'
+DRIFT_SKETCH_KEY = 'predictions/drift_sketch_latest.json'
+
+# Pre-aggregated rollup tables read by the Tableau dashboard, one snapshot_date partition per table per run
+EXTRACTS_PREFIX = 'predictions/extracts'
+
+# Latest per player feature vectors (exported by 03_modeling) used for {"player_ids": [...]} requests,
+# copied to /tmp once per warm container and memory mapped from there (the index's ETag versions both files)
+FEATURE_SNAPSHOT_PREFIX = 'features/player_feature_snapshot'
+LOCAL_SNAPSHOT_PREFIX = '/tmp/player_feature_snapshot'
+_snapshot_cache = {}
+
+# Binary prediction threshold and risk tiers on the injury probability (also used by scripts/rest_schedule_simulator)
+PREDICTION_THRESHOLD = 0.2
+RISK_BINS = [0, 0.1, 0.3, 0.5, 1.0]
+RISK_LABELS = ['Low', 'Medium', 'High', 'Critical']
+
+# Column identifying a player across runs (names are not unique and can change spelling between sources)
+PLAYER_KEY = 'player_id'
+
+# Columns written to latest_predictions.csv (prediction_date is the run date, scored_date when the model last scored the player)
+PREDICTION_COLUMNS = [PLAYER_KEY, 'player_name', 'position', 'risk_probability', 'risk_prediction', 'risk_level', 'prediction_date', 'scored_date']
+
+# Models scored on every run. The primary model drives risk_probability/risk_level,
+# shadow models are scored on the same scaled feature matrix and only written to the model scores file.
+# Every model must use selected_features and the shared scaler.
+MODEL_REGISTRY = [
+    {'name': 'xgboost_14d', 'key': MODEL_KEY, 'horizon': 'injury_next_14_days', 'role': 'primary'},
+    # {'name': 'random_forest_14d', 'key': 'models/random_forest_YYYYMMDD_HHMMSS.pkl',
+    #  'horizon': 'injury_next_14_days', 'role': 'shadow'},
+    # {'name': 'xgboost_7d', 'key': 'models/xgboost_7d_YYYYMMDD_HHMMSS.pkl',
+    #  'horizon': 'injury_next_7_days', 'role': 'shadow'},
+]
+
 def lambda_handler(event, context):
     """
     AWS Lambda function to make NBA injury predictions
@@ -22,31 +72,61 @@ def lambda_handler(event, context):
         s3_client = boto3.client('s3')
         bucket_name = 'ryan-ml-sports-injury-prediction'
         
-        # Downloads model artifacts from S3
-        logger.info("Downloading model artifacts from S3...")
+        # Downloads selected features (reused while the object is unchanged)
+        selected_features = load_cached_pickle(s3_client, bucket_name, FEATURES_KEY, encoding='latin1')
         
-        # Downloads XGBoost model
-        model_obj = s3_client.get_object(Bucket=bucket_name, Key='models/xgboost_20250820_161828.pkl')
-        model = pickle.load(BytesIO(model_obj['Body'].read()), encoding='latin1')
+        # Scores only the requested players from the feature snapshot
+        if event and 'player_ids' in event:
+            return score_requested_players(s3_client, bucket_name, event['player_ids'], selected_features)
+        
+        # Creates sample prediction data (replace with real data in production)
+        sample_data = create_sample_data(selected_features)
         
-        # Downloads scaler
-        scaler_obj = s3_client.get_object(Bucket=bucket_name, Key='models/nba_injury_predictor_v1_scaler.pkl')
-        scaler = pickle.load(BytesIO(scaler_obj['Body'].read()))
+        # Finds players whose features or model version changed since their last score
+        model_version = get_model_version(s3_client, bucket_name)
+        fingerprint_index = load_fingerprint_index(s3_client, bucket_name)
+        feature_hashes, changed = find_changed_players(sample_data, selected_features,
+                                                       fingerprint_index, model_version)
+        logger.info(f"{int(changed.sum())} of {len(sample_data)} players changed since last run")
         
-        # Downloads selected features
-        features_obj = s3_client.get_object(Bucket=bucket_name, Key='models/selected_features.pkl')
-        selected_features = pickle.load(BytesIO(features_obj['Body'].read()), encoding='latin1')
+        # Checks new feature rows against the training distribution
+        drift = monitor_feature_drift(s3_client, bucket_name, sample_data[changed], selected_features)
         
-        logger.info(f"Model loaded successfully. Features: {len(selected_features)}")
+        # Downloads model artifacts and scores only when something changed
+        new_predictions, model_latency = None, None
+        if changed.any():
+            logger.info("Downloading model artifacts from S3...")
+            
+            # Downloads primary and shadow models
+            models = load_registered_models(s3_client, bucket_name)
+            
+            # Versions the scores with the models that actually loaded, so a skipped shadow model
+            # changes the version back on the next run and everyone gets its score column
+            if len(models) < len(MODEL_REGISTRY):
+                model_version = get_model_version(s3_client, bucket_name, [entry for entry, _ in models])
+            
+            # Downloads scaler
+            scaler = load_cached_pickle(s3_client, bucket_name, SCALER_KEY)
+            
+            logger.info(f"{len(models)} models loaded successfully. Features: {len(selected_features)}")
+            
+            # Makes predictions for changed players only (features scaled once, all models scored side by side)
+            new_predictions, model_latency = make_multi_model_predictions(
+                models, scaler, sample_data[changed], selected_features
+            )
         
-        # Creates sample prediction data (replace with real data in production)
-        sample_data = create_sample_data(selected_features)
+        # Merges new scores with cached scores for unchanged players
+        predictions, fingerprint_index = merge_with_cached_predictions(
+            sample_data, new_predictions, fingerprint_index, feature_hashes, changed, model_version
+        )
         
-        # Makes predictions
-        predictions = make_predictions(model, scaler, sample_data, selected_features)
+        # Saves predictions and the updated fingerprint index to S3
+        save_predictions_to_s3(s3_client, bucket_name, predictions[PREDICTION_COLUMNS])
+        save_model_scores_to_s3(s3_client, bucket_name, predictions, model_latency)
+        save_fingerprint_index(s3_client, bucket_name, fingerprint_index)
         
-        # Saves predictions to S3
-        save_predictions_to_s3(s3_client, bucket_name, predictions)
+        # Folds this batch into the Tableau rollup tables
+        update_tableau_extracts(s3_client, bucket_name, predictions)
         
         # Returns response
         return {
@@ -54,9 +134,12 @@ def lambda_handler(event, context):
             'body': json.dumps({
                 'message': 'Predictions completed successfully',
                 'predictions_made': len(predictions),
+                'players_rescored': int(changed.sum()),
+                'model_latency': model_latency.to_dict('records') if model_latency is not None else [],
+                'drifting_features': drift['feature'].tolist() if drift is not None else [],
                 'timestamp': datetime.now().isoformat(),
                 'high_risk_players': int(sum(predictions['risk_probability'] > 0.3)),
-                'sample_predictions': predictions.head(5).to_dict('records')
+                'sample_predictions': predictions[PREDICTION_COLUMNS].head(5).to_dict('records')
             })
         }
         
@@ -70,17 +153,124 @@ def lambda_handler(event, context):
             })
         }
 
+def load_cached_pickle(s3_client, bucket_name, key, **pickle_kwargs):
+    """
+    Returns the unpickled S3 object, downloading it only when its ETag differs from the cached copy
+    """
+    etag = s3_client.head_object(Bucket=bucket_name, Key=key)['ETag']
+    cached = _artifact_cache.get(key)
+    
+    if cached is None or cached[0] != etag:
+        obj = s3_client.get_object(Bucket=bucket_name, Key=key)
+        _artifact_cache[key] = (etag, pickle.load(BytesIO(obj['Body'].read()), **pickle_kwargs))
+        logger.info(f"Loaded {key} (ETag {etag})")
+    
+    return _artifact_cache[key][1]
+
+def load_feature_snapshot(s3_client, bucket_name):
+    """
+    Returns the memory mapped feature snapshot, downloading it to /tmp only when the index's ETag changed
+    The index holds a checksum of the binary file, so its ETag alone tracks both files
+    """
+    keys = snapshot_paths(FEATURE_SNAPSHOT_PREFIX)
+    etag = s3_client.head_object(Bucket=bucket_name, Key=keys[1])['ETag']
+    
+    if _snapshot_cache.get('etag') != etag:
+        for key, local_path in zip(keys, snapshot_paths(LOCAL_SNAPSHOT_PREFIX)):
+            s3_client.download_file(bucket_name, key, local_path)
+        _snapshot_cache['snapshot'] = open_feature_snapshot(LOCAL_SNAPSHOT_PREFIX)
+        _snapshot_cache['etag'] = etag
+        logger.info(f"Feature snapshot loaded: {len(_snapshot_cache['snapshot']['player_ids'])} players")
+    
+    return _snapshot_cache['snapshot']
+
+def parse_player_ids(player_ids):
+    """
+    Converts the request's player_ids (a list of integers or digit strings) to ints
+    Returns (ids, invalid values); anything other than a list is invalid as a whole
+    """
+    if not isinstance(player_ids, list):
+        return [], [player_ids]
+    
+    ids, invalid = [], []
+    for player_id in player_ids:
+        if isinstance(player_id, str) and player_id.strip().isdigit():
+            player_id = int(player_id)
+        # Booleans are ints in Python, and ids must fit the snapshot's int64 index
+        if isinstance(player_id, int) and not isinstance(player_id, bool) and abs(player_id) < 2 ** 63:
+            ids.append(player_id)
+        else:
+            invalid.append(player_id)
+    return ids, invalid
+
+def score_requested_players(s3_client, bucket_name, player_ids, selected_features):
+    """
+    Scores only the requested player ids using their latest snapshot features
+    Nothing is written to S3; unknown ids are returned in missing_player_ids, malformed ids
+    or an empty list get a 400
+    """
+    player_ids, invalid = parse_player_ids(player_ids)
+    if invalid or not player_ids:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'message': 'player_ids must be a non empty list of integer player ids',
+                'invalid_player_ids': invalid
+            })
+        }
+    
+    snapshot = load_feature_snapshot(s3_client, bucket_name)
+    rows, X, missing = lookup_players(snapshot, player_ids, selected_features)
+    
+    if missing:
+        logger.warning(f"{len(missing)} requested players not in feature snapshot: {missing}")
+    if not len(rows):
+        return {
+            'statusCode': 404,
+            'body': json.dumps({
+                'message': 'None of the requested players are in the feature snapshot',
+                'missing_player_ids': missing
+            })
+        }
+    
+    # Player info is optional in the snapshot, ids stand in for missing names
+    found_ids = snapshot['player_ids'][rows]
+    data = pd.DataFrame(X, columns=selected_features)
+    data['player_id'] = found_ids
+    data['player_name'] = [snapshot['player_name'][i] for i in rows] if 'player_name' in snapshot else found_ids.astype(str)
+    data['position'] = [snapshot['position'][i] for i in rows] if 'position' in snapshot else 'Unknown'
+    
+    # Models and scaler stay in memory across warm requests until their ETags change
+    models = load_registered_models(s3_client, bucket_name)
+    scaler = load_cached_pickle(s3_client, bucket_name, SCALER_KEY)
+    
+    predictions, model_latency = make_multi_model_predictions(models, scaler, data, selected_features)
+    predictions['features_as_of'] = [snapshot['as_of'][i] for i in rows]
+    predictions['risk_level'] = predictions['risk_level'].astype(str)
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Predictions completed successfully',
+            'predictions_made': len(predictions),
+            'missing_player_ids': missing,
+            'model_latency': model_latency.to_dict('records'),
+            'timestamp': datetime.now().isoformat(),
+            'predictions': predictions[PREDICTION_COLUMNS + ['features_as_of']].to_dict('records')
+        })
+    }
+
 def create_sample_data(selected_features):
     """
     Creates sample data for testing - replace with real data pipeline
     """
     # Sample player data (normalized values similar to training data)
     sample_players = [
-        {'player_name': 'LeBron James', 'age': 39, 'position': 'SF'},
-        {'player_name': 'Stephen Curry', 'age': 35, 'position': 'PG'},
-        {'player_name': 'Kevin Durant', 'age': 35, 'position': 'PF'},
-        {'player_name': 'Giannis Antetokounmpo', 'age': 29, 'position': 'PF'},
-        {'player_name': 'Luka Doncic', 'age': 25, 'position': 'PG'}
+        {'player_id': 2544, 'player_name': 'LeBron James', 'age': 39, 'position': 'SF'},
+        {'player_id': 201939, 'player_name': 'Stephen Curry', 'age': 35, 'position': 'PG'},
+        {'player_id': 201142, 'player_name': 'Kevin Durant', 'age': 35, 'position': 'PF'},
+        {'player_id': 203507, 'player_name': 'Giannis Antetokounmpo', 'age': 29, 'position': 'PF'},
+        {'player_id': 1629029, 'player_name': 'Luka Doncic', 'age': 25, 'position': 'PG'}
     ]
     
     # Generates realistic feature values
@@ -107,6 +297,7 @@ def create_sample_data(selected_features):
             else:
                 row[feature] = np.random.normal(0, 1)  # Standardized features
         
+        row['player_id'] = player['player_id']
         row['player_name'] = player['player_name']
         row['position'] = player['position']
         data.append(row)
@@ -125,19 +316,296 @@ def make_predictions(model, scaler, data, selected_features):
     
     # Makes predictions
     risk_probabilities = model.predict_proba(X_scaled)[:, 1]  # Probability of injury
-    risk_predictions = (risk_probabilities > 0.2).astype(int)  # Binary prediction
+    
+    return build_prediction_frame(data, risk_probabilities)
+
+def build_prediction_frame(data, risk_probabilities):
+    """
+    Turns injury probabilities into the predictions table (binary prediction and risk level)
+    """
+    risk_predictions = (risk_probabilities > PREDICTION_THRESHOLD).astype(int)  # Binary prediction
     
     # Creates results dataframe
-    results = data[['player_name', 'position']].copy()
+    results = data[[PLAYER_KEY, 'player_name', 'position']].copy()
     results['risk_probability'] = risk_probabilities
     results['risk_prediction'] = risk_predictions
-    results['risk_level'] = pd.cut(risk_probabilities, 
-                                   bins=[0, 0.1, 0.3, 0.5, 1.0], 
-                                   labels=['Low', 'Medium', 'High', 'Critical'])
+    results['risk_level'] = pd.cut(risk_probabilities, bins=RISK_BINS, labels=RISK_LABELS)
     results['prediction_date'] = datetime.now().strftime('%Y-%m-%d')
+    results['scored_date'] = results['prediction_date']
     
     return results
 
+def load_registered_models(s3_client, bucket_name):
+    """
+    Loads every model in MODEL_REGISTRY (downloaded only when its ETag changed since the cached copy)
+    A shadow model that fails to load is logged and skipped so it never blocks the primary predictions
+    """
+    models = []
+    for entry in MODEL_REGISTRY:
+        try:
+            model = load_cached_pickle(s3_client, bucket_name, entry['key'], encoding='latin1')
+        except Exception as e:
+            if entry['role'] == 'primary':
+                raise
+            logger.warning(f"Skipping shadow model {entry['name']}: {str(e)}")
+            continue
+        models.append((entry, model))
+    return models
+
+def _score_model(model, X_scaled):
+    # Times one model's predict_proba on the shared scaled matrix
+    start = time.perf_counter()
+    risk_probabilities = model.predict_proba(X_scaled)[:, 1]
+    return risk_probabilities, time.perf_counter() - start
+
+def make_multi_model_predictions(models, scaler, data, selected_features):
+    """
+    Scores all registered models from a single scaled feature matrix on a thread pool
+    Returns (predictions from the primary model plus a score_<name> column per model, per model latency)
+    """
+    # Prepares and scales the feature matrix once for every model
+    start = time.perf_counter()
+    X_scaled = scaler.transform(data[selected_features].values)
+    prepare_seconds = time.perf_counter() - start
+    
+    # predict_proba in XGBoost and scikit-learn releases the GIL, so models score concurrently
+    with ThreadPoolExecutor(max_workers=len(models)) as pool:
+        futures = [pool.submit(_score_model, model, X_scaled) for _, model in models]
+        scores = [future.result() for future in futures]
+    
+    primary = [i for i, (entry, _) in enumerate(models) if entry['role'] == 'primary'][0]
+    results = build_prediction_frame(data, scores[primary][0])
+    
+    latency = []
+    for (entry, _), (risk_probabilities, seconds) in zip(models, scores):
+        results[f"score_{entry['name']}"] = risk_probabilities
+        latency.append({
+            'model': entry['name'],
+            'horizon': entry['horizon'],
+            'role': entry['role'],
+            'rows_scored': len(data),
+            'predict_seconds': round(seconds, 6),
+            'prepare_seconds': round(prepare_seconds, 6)
+        })
+        logger.info(f"{entry['name']} ({entry['role']}, {entry['horizon']}): {seconds * 1000:.1f} ms for {len(data)} players")
+    
+    return results, pd.DataFrame(latency)
+
+def get_model_version(s3_client, bucket_name, entries=None):
+    """
+    Identifies the deployed models, scaler and selected features by key and ETag
+    so a retrained upload of any of them invalidates cached scores
+    entries limits the models to a subset of MODEL_REGISTRY (e.g. the ones that loaded)
+    """
+    versions = []
+    for key in [SCALER_KEY, FEATURES_KEY]:
+        etag = s3_client.head_object(Bucket=bucket_name, Key=key)['ETag'].strip('"')
+        versions.append(f"{key}@{etag}")
+    
+    for entry in MODEL_REGISTRY if entries is None else entries:
+        try:
+            head = s3_client.head_object(Bucket=bucket_name, Key=entry['key'])
+        except Exception:
+            if entry['role'] == 'primary':
+                raise
+            continue
+        etag = head['ETag'].strip('"')
+        versions.append(f"{entry['key']}@{etag}")
+    return '|'.join(versions)
+
+def compute_feature_hashes(data, selected_features):
+    """
+    Hashes each player's feature vector in one vectorized pass (uint64 per row)
+    """
+    features = data[selected_features].astype(np.float64)
+    return pd.util.hash_pandas_object(features, index=False).to_numpy()
+
+def load_fingerprint_index(s3_client, bucket_name):
+    """
+    Loads the last score, feature hash and model version for every player
+    Returns an empty index on the first run or when the stored index is keyed on another column
+    """
+    empty_index = pd.DataFrame(columns=[PLAYER_KEY, 'feature_hash', 'model_version'])
+    try:
+        index_obj = s3_client.get_object(Bucket=bucket_name, Key=FINGERPRINT_INDEX_KEY)
+    except s3_client.exceptions.NoSuchKey:
+        logger.info("No fingerprint index found, scoring all players")
+        return empty_index
+    
+    fingerprint_index = pd.read_csv(BytesIO(index_obj['Body'].read()), dtype={'feature_hash': 'uint64'})
+    if PLAYER_KEY not in fingerprint_index.columns:
+        logger.info(f"Fingerprint index has no {PLAYER_KEY} column, scoring all players")
+        return empty_index
+    return fingerprint_index
+
+def find_changed_players(data, selected_features, fingerprint_index, model_version):
+    """
+    Compares current feature hashes against the index
+    A player needs rescoring if they are new, their features changed, or the model changed
+    Returns (feature hashes, boolean mask of players to rescore)
+    """
+    feature_hashes = compute_feature_hashes(data, selected_features)
+    
+    cached = fingerprint_index.drop_duplicates(PLAYER_KEY, keep='last').set_index(PLAYER_KEY)
+    
+    # Object dtype keeps the uint64 hashes exact when new players introduce NaN
+    cached = cached.astype({'feature_hash': object}).reindex(data[PLAYER_KEY])
+    previous_hashes = cached['feature_hash'].to_numpy()
+    
+    changed = (
+        pd.isna(previous_hashes)
+        | (previous_hashes != feature_hashes)
+        | (cached['model_version'].to_numpy() != model_version)
+    )
+    return feature_hashes, changed
+
+def merge_with_cached_predictions(data, new_predictions, fingerprint_index, feature_hashes, changed, model_version):
+    """
+    Combines fresh scores for changed players with cached scores for everyone else
+    Every row gets this run's prediction_date, reused rows keep the scored_date of their cached score
+    Keeps the input player order and returns (predictions, updated fingerprint index)
+    """
+    cached = fingerprint_index.drop_duplicates(PLAYER_KEY, keep='last').set_index(PLAYER_KEY)
+    unchanged_players = data.loc[~changed, PLAYER_KEY]
+    
+    parts = []
+    if new_predictions is not None:
+        parts.append(new_predictions.assign(_row=np.flatnonzero(changed)))
+    if len(unchanged_players):
+        reused = cached.loc[unchanged_players].reset_index()
+        # Indexes written before scored_date existed only have the date the score was made
+        if 'scored_date' not in reused.columns:
+            reused['scored_date'] = reused['prediction_date']
+        parts.append(reused.assign(_row=np.flatnonzero(~changed)))
+    
+    predictions = pd.concat(parts, ignore_index=True).sort_values('_row')
+    predictions['prediction_date'] = datetime.now().strftime('%Y-%m-%d')
+    predictions['feature_hash'] = feature_hashes[predictions['_row'].to_numpy()]
+    predictions['model_version'] = model_version
+    
+    fingerprint_index = predictions.drop(columns='_row').reset_index(drop=True)
+    predictions = fingerprint_index.drop(columns=['feature_hash', 'model_version'])
+    return predictions, fingerprint_index
+
+def _load_json(s3_client, bucket_name, key):
+    # Returns None when the object does not exist yet
+    try:
+        obj = s3_client.get_object(Bucket=bucket_name, Key=key)
+    except s3_client.exceptions.NoSuchKey:
+        return None
+    return json.loads(obj['Body'].read())
+
+def monitor_feature_drift(s3_client, bucket_name, data, selected_features):
+    """
+    Adds this run's raw feature rows to the running drift sketch and compares both this batch and the
+    running sketch with the training baseline
+    Saves the merged sketch and a PSI/KS report next to the predictions
+    Returns the features at or above the drift threshold in either (None if the check was skipped)
+    Drift checks never fail the prediction run
+    """
+    try:
+        baseline = _load_json(s3_client, bucket_name, DRIFT_BASELINE_KEY)
+        if baseline is None:
+            logger.info("No feature baseline found, skipping drift check")
+            return None
+        if data.empty:
+            return None
+        
+        # Fixed size sketch of this batch, merged into the running sketch (no historical data reloaded)
+        batch_sketch = update_sketch(empty_sketch_like(baseline), data[selected_features].values, selected_features)
+        running_sketch = _load_json(s3_client, bucket_name, DRIFT_SKETCH_KEY)
+        running_sketch = merge_sketches(running_sketch, batch_sketch) if running_sketch else batch_sketch
+        
+        report = batch_and_running_report(baseline, running_sketch, batch_sketch)
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=DRIFT_SKETCH_KEY,
+            Body=json.dumps(running_sketch),
+            ContentType='application/json'
+        )
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=f'predictions/drift_report_{timestamp}.csv',
+            Body=report.to_csv(index=False),
+            ContentType='text/csv'
+        )
+        
+        drifting = report[(report['status'] == 'drift') | (report['batch_status'] == 'drift')]
+        logger.info(f"Drift check: {len(drifting)} of {len(report)} features drifting "
+                    f"({running_sketch['n_rows']} rows sketched)")
+        return drifting
+    
+    except Exception as e:
+        logger.warning(f"Drift check failed: {str(e)}")
+        return None
+
+def update_tableau_extracts(s3_client, bucket_name, predictions):
+    """
+    Writes this run's risk tier counts and player time series as today's extract partitions
+    Earlier partitions are never read or rewritten, a rerun on the same day overwrites today's
+    Extract updates never fail the prediction run
+    """
+    try:
+        snapshot_date = datetime.now().strftime('%Y-%m-%d')
+        extracts = snapshot_extracts(predictions, snapshot_date)
+        
+        for table, extract in extracts.items():
+            s3_client.put_object(
+                Bucket=bucket_name,
+                Key=partition_key(EXTRACTS_PREFIX, table, snapshot_date),
+                Body=extract.to_csv(index=False),
+                ContentType='text/csv'
+            )
+        
+        logger.info(f"Tableau extracts written for {snapshot_date}: "
+                    + ", ".join(f"{table} {len(extract)} rows" for table, extract in extracts.items()))
+    
+    except Exception as e:
+        logger.warning(f"Tableau extract update failed: {str(e)}")
+
+def save_fingerprint_index(s3_client, bucket_name, fingerprint_index):
+    """
+    Saves the fingerprint index next to the predictions
+    """
+    csv_buffer = BytesIO()
+    fingerprint_index.to_csv(csv_buffer, index=False)
+    
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=FINGERPRINT_INDEX_KEY,
+        Body=csv_buffer.getvalue(),
+        ContentType='text/csv'
+    )
+    
+    logger.info(f"Fingerprint index saved to S3: {FINGERPRINT_INDEX_KEY}")
+
+def save_model_scores_to_s3(s3_client, bucket_name, predictions, model_latency):
+    """
+    Saves every registered model's score side by side, plus the latency of models scored this run
+    """
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    score_columns = [col for col in predictions.columns if col.startswith('score_')]
+    
+    scores = predictions[[PLAYER_KEY, 'player_name', 'position'] + score_columns]
+    s3_client.put_object(
+        Bucket=bucket_name,
+        Key=f'predictions/model_scores_{timestamp}.csv',
+        Body=scores.to_csv(index=False),
+        ContentType='text/csv'
+    )
+    
+    if model_latency is not None:
+        s3_client.put_object(
+            Bucket=bucket_name,
+            Key=f'predictions/model_latency_{timestamp}.csv',
+            Body=model_latency.to_csv(index=False),
+            ContentType='text/csv'
+        )
+    
+    logger.info(f"Model scores saved to S3: predictions/model_scores_{timestamp}.csv")
+
 def save_predictions_to_s3(s3_client, bucket_name, predictions):
     """
     Saves predictions to S3 as CSV
@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+RISK_LEVELS = ['Low', 'Medium', 'High', 'Critical']
+
+# Rollup dimensions, used when present on the predictions (team is not in the current sample data)
+ROLLUP_DIMENSIONS = ['team', 'position']
+
+TIER_COUNT_COLUMNS = ['snapshot_date'] + ROLLUP_DIMENSIONS + [
+    'risk_level', 'player_count', 'predicted_positive_count', 'risk_probability_sum', 'risk_probability_max'
+]
+TIMESERIES_COLUMNS = ['snapshot_date', 'player_name', 'team', 'position',
+                      'risk_probability', 'risk_prediction', 'risk_level']
+
+def _with_dimensions(predictions, snapshot_date):
+    # Copies the batch, filling rollup dimensions the predictions do not carry with 'All'
+    df = predictions.copy()
+    for dim in ROLLUP_DIMENSIONS:
+        if dim not in df.columns:
+            df[dim] = 'All'
+    df['risk_level'] = df['risk_level'].astype(str)
+    df['snapshot_date'] = snapshot_date
+    return df
+
+def summarize_tier_counts(predictions, snapshot_date):
+    """
+    Risk tier counts for one prediction batch per team/position/risk_level
+    risk_probability_sum is stored instead of the mean so Tableau can average correctly across any grouping
+    """
+    df = _with_dimensions(predictions, snapshot_date)
+
+    # Only observed combinations are stored (Tableau treats a missing tier as zero)
+    counts = df.groupby(ROLLUP_DIMENSIONS + ['risk_level']).agg(
+        player_count=('risk_probability', 'size'),
+        predicted_positive_count=('risk_prediction', 'sum'),
+        risk_probability_sum=('risk_probability', 'sum'),
+        risk_probability_max=('risk_probability', 'max')
+    ).reset_index()
+    counts['snapshot_date'] = snapshot_date
+    return counts[TIER_COUNT_COLUMNS].reset_index(drop=True)
+
+def summarize_player_timeseries(predictions, snapshot_date):
+    """
+    One row per player for the batch, appended to the per player risk time series
+    """
+    return _with_dimensions(predictions, snapshot_date).reindex(columns=TIMESERIES_COLUMNS)
+
+def snapshot_extracts(predictions, snapshot_date):
+    """
+    Both rollup tables for one prediction batch, keyed by table name
+    Each batch is stored as its own snapshot_date partition, so a run never reads or rewrites earlier days
+    and rerunning a day simply overwrites that day's partition
+    """
+    return {
+        'risk_tier_counts': summarize_tier_counts(predictions, snapshot_date),
+        'player_risk_timeseries': summarize_player_timeseries(predictions, snapshot_date)
+    }
+
+def partition_key(prefix, table, snapshot_date):
+    """
+    Object key of one table's partition (Tableau unions the folder with a wildcard text file connection)
+    """
+    return f'{prefix}/{table}/snapshot_date={snapshot_date}.csv'
+
+if __name__ == "__main__":
+    # A season of nightly batches for a 450 player league, each written as its own partition
+    rng = np.random.default_rng(3)
+    n_players = 450
+    players = pd.DataFrame({
+        'player_name': [f'Player {i}' for i in range(n_players)],
+        'team': rng.choice([f'Team {t}' for t in range(30)], n_players),
+        'position': rng.choice(['PG', 'SG', 'SF', 'PF', 'C'], n_players)
+    })
+
+    batch_seconds, partition_rows = [], {}
+    for snapshot_date in pd.date_range('2024-10-22', periods=170).strftime('%Y-%m-%d'):
+        batch = players.copy()
+        batch['risk_probability'] = rng.beta(2, 8, n_players)
+        batch['risk_prediction'] = (batch['risk_probability'] > 0.2).astype(int)
+        batch['risk_level'] = pd.cut(batch['risk_probability'], bins=[0, 0.1, 0.3, 0.5, 1.0], labels=RISK_LEVELS)
+
+        start = time.perf_counter()
+        extracts = snapshot_extracts(batch, snapshot_date)
+        batch_seconds.append(time.perf_counter() - start)
+        for table, extract in extracts.items():
+            partition_rows[partition_key('predictions/extracts', table, snapshot_date)] = len(extract)
+
+    print(f"Average batch (one partition per table): {np.mean(batch_seconds) * 1000:.1f} ms")
+    print(f"{len(partition_rows)} partitions, {max(partition_rows.values())} rows at most per partition")
+    print(extracts['risk_tier_counts'].head(8).round(3).to_string(index=False))
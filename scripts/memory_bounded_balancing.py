@@ -0,0 +1,295 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+from sklearn.neighbors import NearestNeighbors
+
+# Same oversampling target and neighbor count as implement_class_balancing
+SAMPLING_STRATEGY = 0.3
+K_NEIGHBORS = 3
+
+# Rows read or generated per chunk (bounds the working memory of every step)
+CHUNK_SIZE = 50_000
+
+# Random projection size for the approximate neighbor search (features are used as is when there are fewer)
+PROJECTION_DIMS = 16
+
+# Same extreme value capping as clean_dataset: a percentile beyond the limit becomes the column's cap
+EXTREME_VALUE_LIMIT = 1e10
+CAP_QUANTILES = (0.001, 0.999)
+
+def _to_float32(chunk):
+    # Same missing value handling as fillna(0) before SMOTE; infinities also become 0 so the output is finite
+    chunk = np.asarray(chunk, dtype=np.float32)
+    return np.where(np.isfinite(chunk), chunk, np.float32(0))
+
+def _rows(X, start, stop, columns=None):
+    # Slices rows (and columns: names for a dataframe, positions for an array) one chunk at a time,
+    # so neither the whole matrix nor a column subset of it is ever copied
+    if isinstance(X, pd.DataFrame):
+        chunk = X.iloc[start:stop]
+        return (chunk if columns is None else chunk[columns]).to_numpy()
+    return X[start:stop] if columns is None else X[start:stop, columns]
+
+def _n_columns(X, columns):
+    return X.shape[1] if columns is None else len(columns)
+
+def _cap_extreme_values(X_out, col_min, col_max, chunk_size=CHUNK_SIZE):
+    # Percentiles are only computed (one column at a time) for columns whose range passes the limit,
+    # then the capped columns are clipped chunk by chunk in place
+    lowers, uppers, capped = [], [], []
+    for j in np.flatnonzero((col_max > EXTREME_VALUE_LIMIT) | (col_min < -EXTREME_VALUE_LIMIT)):
+        lower, upper = np.quantile(np.asarray(X_out[:, j], dtype=np.float64), CAP_QUANTILES)
+        if upper > EXTREME_VALUE_LIMIT or lower < -EXTREME_VALUE_LIMIT:
+            capped.append(j)
+            lowers.append(lower if lower < -EXTREME_VALUE_LIMIT else -np.inf)
+            uppers.append(upper if upper > EXTREME_VALUE_LIMIT else np.inf)
+
+    for start in range(0, len(X_out), chunk_size) if capped else []:
+        stop = min(start + chunk_size, len(X_out))
+        X_out[start:stop, capped] = np.clip(X_out[start:stop, capped], lowers, uppers)
+    return capped
+
+def n_synthetic_samples(y, sampling_strategy=SAMPLING_STRATEGY):
+    """
+    Number of synthetic minority rows needed for minority / majority = sampling_strategy (as in imblearn)
+    """
+    y = np.asarray(y)
+    n_minority = int((y == 1).sum())
+    n_majority = int((y == 0).sum())
+    return max(0, int(sampling_strategy * n_majority) - n_minority)
+
+def build_minority_neighbor_index(X_minority, k_neighbors=K_NEIGHBORS, projection_dims=PROJECTION_DIMS,
+                                  random_state=42):
+    """
+    Precomputes the k nearest minority neighbors of every minority row (self excluded)
+    Rows are first reduced with a Gaussian random projection, so neighbors are approximate but the
+    search runs on a small dense matrix of minority rows only
+    Returns an (n_minority, k_neighbors) int32 array of row positions into X_minority
+    """
+    X_minority = np.asarray(X_minority, dtype=np.float32)
+    n_minority, n_features = X_minority.shape
+    if n_minority <= k_neighbors:
+        raise ValueError(f"Need more than {k_neighbors} minority rows, got {n_minority}")
+
+    if n_features > projection_dims:
+        rng = np.random.default_rng(random_state)
+        projection = rng.normal(scale=1 / np.sqrt(projection_dims), size=(n_features, projection_dims))
+        X_search = X_minority @ projection.astype(np.float32)
+    else:
+        X_search = X_minority
+
+    nn = NearestNeighbors(n_neighbors=k_neighbors + 1).fit(X_search)
+    neighbors = np.empty((n_minority, k_neighbors), dtype=np.int32)
+    for start in range(0, n_minority, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n_minority)
+        _, idx = nn.kneighbors(X_search[start:stop])
+        # Drops each row's own position (not always column 0 when rows are duplicated)
+        own = np.arange(start, stop)[:, None]
+        keep = idx != own
+        keep[keep.sum(axis=1) > k_neighbors, -1] = False
+        neighbors[start:stop] = idx[keep].reshape(-1, k_neighbors)
+
+    return neighbors
+
+def chunked_smote_to_memmap(X, y, path, feature_cols=None, sampling_strategy=SAMPLING_STRATEGY,
+                            k_neighbors=K_NEIGHBORS, chunk_size=CHUNK_SIZE, random_state=42):
+    """
+    SMOTE style oversampling written straight to a memory mapped .npy file
+    Original rows are copied over chunk by chunk, then synthetic minority rows are interpolated
+    chunk by chunk between a minority row and one of its precomputed neighbors
+    Only the minority rows and the output chunk are held in memory; feature_cols selects the columns per chunk
+    so a wide training frame can be passed as is
+    Extreme values are then capped like clean_dataset (0.1 / 99.9 percentiles of the balanced rows, only
+    where they pass +-1e10), so the output matches the in-memory SMOTE path after cleaning
+    Returns (X_balanced memmap, y_balanced memmap); labels are saved next to path as *_labels.npy
+    """
+    y = np.asarray(y).astype(np.int8)
+    n_rows, n_features = len(X), _n_columns(X, feature_cols)
+    n_synthetic = n_synthetic_samples(y, sampling_strategy)
+    rng = np.random.default_rng(random_state)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    labels_path = os.path.splitext(path)[0] + '_labels.npy'
+    X_out = open_memmap(path, mode='w+', dtype=np.float32, shape=(n_rows + n_synthetic, n_features))
+    y_out = open_memmap(labels_path, mode='w+', dtype=np.int8, shape=(n_rows + n_synthetic,))
+
+    # Copies the original rows and collects the minority rows (tracking column ranges for the capping pass)
+    minority_parts = []
+    col_min, col_max = np.full(n_features, np.inf), np.full(n_features, -np.inf)
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        chunk = _to_float32(_rows(X, start, stop, feature_cols))
+        X_out[start:stop] = chunk
+        col_min, col_max = np.minimum(col_min, chunk.min(axis=0)), np.maximum(col_max, chunk.max(axis=0))
+        minority_parts.append(chunk[y[start:stop] == 1])
+    y_out[:n_rows] = y
+
+    if n_synthetic:
+        X_minority = np.concatenate(minority_parts)
+        neighbors = build_minority_neighbor_index(X_minority, k_neighbors, random_state=random_state)
+
+        # Synthetic rows: base + gap * (neighbor - base), gap ~ U(0, 1)
+        for start in range(0, n_synthetic, chunk_size):
+            size = min(chunk_size, n_synthetic - start)
+            base = rng.integers(0, len(X_minority), size)
+            neighbor = neighbors[base, rng.integers(0, k_neighbors, size)]
+            gap = rng.random((size, 1), dtype=np.float32)
+            X_out[n_rows + start:n_rows + start + size] = (
+                X_minority[base] + gap * (X_minority[neighbor] - X_minority[base])
+            )
+        y_out[n_rows:] = 1
+
+    _cap_extreme_values(X_out, col_min, col_max, chunk_size)
+
+    X_out.flush()
+    y_out.flush()
+    return X_out, y_out
+
+def chunked_correlation(X, columns=None, chunk_size=CHUNK_SIZE):
+    """
+    Pearson correlation matrix of the columns of X, accumulated in float64 over row chunks
+    Same values as DataFrame.corr() on finite data, without materializing a float64 copy of X
+    """
+    n_features = _n_columns(X, columns)
+    shift = None
+    n, sums, cross = 0, np.zeros(n_features), np.zeros((n_features, n_features))
+    for start in range(0, len(X), chunk_size):
+        chunk = np.asarray(_rows(X, start, min(start + chunk_size, len(X)), columns), dtype=np.float64)
+        # Centers on the first chunk's mean to avoid cancellation in the cross products
+        if shift is None:
+            shift = chunk.mean(axis=0)
+        chunk -= shift
+        n += len(chunk)
+        sums += chunk.sum(axis=0)
+        cross += chunk.T @ chunk
+
+    mean = sums / n
+    cov = (cross - n * np.outer(mean, mean)) / (n - 1)
+    std = np.sqrt(np.clip(np.diag(cov), 0, None))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = np.clip(cov / np.outer(std, std), -1, 1)
+    # Constant columns have no defined correlation (NaN, as in pandas)
+    corr[std == 0, :] = np.nan
+    corr[:, std == 0] = np.nan
+    return corr
+
+def chunked_f_classif(X, y, columns=None, chunk_size=CHUNK_SIZE):
+    """
+    One way ANOVA F score of every column against the class labels (sklearn's f_classif), from per class
+    sums and sums of squares accumulated over row chunks
+    """
+    y = np.asarray(y)
+    classes = np.unique(y)
+    n_features = _n_columns(X, columns)
+    counts = np.array([(y == c).sum() for c in classes], dtype=np.float64)
+    sums = np.zeros((len(classes), n_features))
+    squares = np.zeros((len(classes), n_features))
+    for start in range(0, len(X), chunk_size):
+        stop = min(start + chunk_size, len(X))
+        chunk = np.asarray(_rows(X, start, stop, columns), dtype=np.float64)
+        for i, c in enumerate(classes):
+            rows = chunk[y[start:stop] == c]
+            sums[i] += rows.sum(axis=0)
+            squares[i] += (rows ** 2).sum(axis=0)
+
+    n = counts.sum()
+    total = sums.sum(axis=0)
+    ss_total = squares.sum(axis=0) - total ** 2 / n
+    ss_between = (sums ** 2 / counts[:, None]).sum(axis=0) - total ** 2 / n
+    ss_within = ss_total - ss_between
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (ss_between / (len(classes) - 1)) / (ss_within / (n - len(classes)))
+
+def vif_from_correlation(corr):
+    """
+    Variance inflation factors of standardized features: the diagonal of the inverse correlation matrix
+    (what variance_inflation_factor returns on StandardScaler output)
+    Constant columns get NaN and perfectly collinear sets get inf
+    """
+    corr = np.asarray(corr, dtype=np.float64)
+    valid = ~np.isnan(np.diag(corr))
+    vif = np.full(len(corr), np.nan)
+    try:
+        vif[valid] = np.diag(np.linalg.inv(corr[np.ix_(valid, valid)]))
+    except np.linalg.LinAlgError:
+        vif[valid] = np.inf
+    return vif
+
+def weighted_sampling_batches(X, y, batch_size=1024, sampling_strategy=SAMPLING_STRATEGY, n_batches=None,
+                              random_state=42, feature_cols=None):
+    """
+    Alternative to oversampling: yields (X_batch, y_batch) drawn with replacement so each batch has the same
+    minority share as a sampling_strategy oversampled set, without writing any extra rows
+    Defaults to one oversampled epoch worth of batches; row indices are sorted so memmap reads stay sequential
+    """
+    y = np.asarray(y)
+    minority_idx = np.flatnonzero(y == 1)
+    majority_idx = np.flatnonzero(y == 0)
+    minority_share = sampling_strategy / (1 + sampling_strategy)
+    rng = np.random.default_rng(random_state)
+
+    if n_batches is None:
+        n_balanced = len(y) + n_synthetic_samples(y, sampling_strategy)
+        n_batches = int(np.ceil(n_balanced / batch_size))
+
+    for _ in range(n_batches):
+        n_pos = rng.binomial(batch_size, minority_share)
+        idx = np.sort(np.concatenate([
+            rng.choice(minority_idx, n_pos),
+            rng.choice(majority_idx, batch_size - n_pos)
+        ]))
+        if isinstance(X, pd.DataFrame):
+            X_batch = (X.iloc[idx] if feature_cols is None else X.iloc[idx][feature_cols]).to_numpy()
+        else:
+            X_batch = X[idx] if feature_cols is None else X[idx][:, feature_cols]
+        yield _to_float32(X_batch), y[idx]
+
+if __name__ == "__main__":
+    # Multi season sized training frame with a ~4% injury rate
+    rng = np.random.default_rng(42)
+    n_rows, n_features = 1_000_000, 60
+    X = pd.DataFrame(rng.normal(size=(n_rows, n_features)).astype(np.float32),
+                     columns=[f'feature_{i}' for i in range(n_features)])
+    X.iloc[rng.integers(0, n_rows, 10_000), 0] = np.nan
+    # Overflowed ratio style values, the largest ones capped at the 99.9th percentile like clean_dataset
+    X.iloc[rng.integers(0, n_rows, 2_000), 2] = 1e12
+    X.iloc[rng.integers(0, n_rows, 200), 2] = 1e15
+    y = (rng.random(n_rows) < 0.04).astype(np.int8)
+    X.loc[y == 1, 'feature_1'] += 1.5
+
+    path = os.path.join(tempfile.mkdtemp(), 'X_train_balanced.npy')
+
+    start = time.perf_counter()
+    X_balanced, y_balanced = chunked_smote_to_memmap(X, y, path)
+    elapsed = time.perf_counter() - start
+
+    print(f"Chunked SMOTE: {n_rows:,} -> {len(y_balanced):,} rows in {elapsed:.2f}s")
+    print(f"- Minority / majority: {(y_balanced == 1).sum() / (y_balanced == 0).sum():.3f}")
+    print(f"- Output on disk: {os.path.getsize(path) / 1024 ** 2:.0f} MB (memory mapped)")
+    print(f"- feature_2 capped at {X_balanced[:, 2].max():.3g}")
+
+    start = time.perf_counter()
+    batches = weighted_sampling_batches(X_balanced[:n_rows], y, batch_size=4096)
+    minority_share = np.mean([y_batch.mean() for _, y_batch in batches])
+    print(f"Weighted sampling epoch: {time.perf_counter() - start:.2f}s, minority share {minority_share:.3f}")
+
+    # Feature selection statistics straight from the memory mapped output
+    from sklearn.feature_selection import f_classif
+    check_cols = list(range(8))
+    start = time.perf_counter()
+    corr = chunked_correlation(X_balanced, check_cols)
+    scores = chunked_f_classif(X_balanced, y_balanced, check_cols)
+    print(f"Chunked correlation + F scores: {time.perf_counter() - start:.2f}s")
+    sample = np.asarray(X_balanced[:, check_cols], dtype=np.float64)
+    print(f"- Max abs difference vs np.corrcoef: {np.abs(corr - np.corrcoef(sample, rowvar=False)).max():.2e}")
+    print(f"- Max relative difference vs f_classif: "
+          f"{np.abs(scores / f_classif(sample, y_balanced)[0] - 1).max():.2e}")
+    print(f"- VIF of independent features: {vif_from_correlation(corr).round(3)}")
+
+    del X_balanced, y_balanced
+    os.remove(path)
+    os.remove(os.path.splitext(path)[0] + '_labels.npy')
@@ -0,0 +1,322 @@
+import time
+from collections import OrderedDict
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from player_data_dtypes import compact_player_data
+
+# eventmsgtype -> player-game count column (same buckets as load_player_game_data SQL)
+EVENT_COLUMNS = {
+    1: 'made_shots',
+    2: 'missed_shots',
+    3: 'free_throws',
+    4: 'rebounds',
+    6: 'fouls',
+    5: 'turnovers',
+    8: 'substitutions'
+}
+
+# eventmsgtype values above this are folded into the last bucket (counted as other_events)
+MAX_EVENT_TYPE = 15
+N_BUCKETS = MAX_EVENT_TYPE + 1
+
+# Columns needed from play_by_play event rows
+EVENT_FIELDS = ['game_id', 'player1_id', 'player1_name', 'eventmsgtype']
+
+# Output columns in the same order as load_player_game_data
+PLAYER_GAME_COLUMNS = [
+    'game_id', 'game_date', 'player_id', 'player_name', 'season_id', 'season_type',
+    'total_actions', 'made_shots', 'missed_shots', 'free_throws', 'rebounds',
+    'fouls', 'turnovers', 'substitutions', 'other_events'
+]
+
+def iter_event_chunks(source, chunksize=100_000):
+    """
+    Yields play by play events as dataframes of at most chunksize rows
+    Source can be a CSV path, a dataframe, or any iterator of event dicts
+    """
+    if isinstance(source, str):
+        yield from pd.read_csv(
+            source,
+            usecols=EVENT_FIELDS,
+            dtype={'game_id': str, 'player1_id': str, 'player1_name': str},
+            chunksize=chunksize
+        )
+    elif isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize][EVENT_FIELDS]
+    else:
+        rows = iter(source)
+        while True:
+            batch = list(islice(rows, chunksize))
+            if not batch:
+                return
+            yield pd.DataFrame.from_records(batch, columns=EVENT_FIELDS)
+
+class PlayByPlayAggregator:
+    """
+    Streaming replacement for the play_by_play GROUP BY in load_player_game_data
+    Counts events per (game_id, player1_id, eventmsgtype) with np.bincount one chunk at a time
+    Only the most recent max_open_games games are held in memory; older games are treated as finished
+    (play by play exports are ordered by game, so a game is complete once later games have started)
+    A closed game that shows up again is emitted again as a partial row, combine_partial_counts sums them
+    """
+
+    def __init__(self, max_open_games=64):
+        self.max_open_games = max_open_games
+        self._open_games = OrderedDict()  # game_id -> {player_id: counts array}
+        self._player_names = {}
+        self._finished = []
+
+    def consume(self, events):
+        """
+        Adds one chunk of event rows to the running counts
+        Returns any player-game rows that finished as a result (may be empty)
+        """
+        events = events[
+            events['player1_id'].notna() & (events['player1_id'].astype(str) != '0')
+        ]
+        if events.empty:
+            return self._drain()
+
+        game_codes, game_ids = pd.factorize(events['game_id'].astype(str))
+        player_codes, player_ids = pd.factorize(events['player1_id'].astype(str))
+        event_types = np.clip(events['eventmsgtype'].to_numpy(dtype=np.int64), 0, MAX_EVENT_TYPE)
+
+        # Single bincount over (player-game, event type) buckets for the whole chunk
+        pair_codes, pairs = pd.factorize(game_codes.astype(np.int64) * len(player_ids) + player_codes)
+        counts = np.bincount(
+            pair_codes * N_BUCKETS + event_types,
+            minlength=len(pairs) * N_BUCKETS
+        ).reshape(len(pairs), N_BUCKETS)
+
+        # Remembers the latest name seen for each player
+        names = events['player1_name'].to_numpy()
+        last_rows = pd.Series(np.arange(len(player_codes))).groupby(player_codes).last()
+        for code, row in last_rows.items():
+            self._player_names[player_ids[code]] = names[row]
+
+        pair_games = game_ids[pairs // len(player_ids)]
+        pair_players = player_ids[pairs % len(player_ids)]
+        for game_id, player_id, row in zip(pair_games, pair_players, counts):
+            if game_id not in self._open_games:
+                self._open_games[game_id] = {}
+            game = self._open_games[game_id]
+            if player_id in game:
+                game[player_id] += row
+            else:
+                game[player_id] = row.astype(np.int32)
+
+        # Closes the oldest games once too many are open
+        while len(self._open_games) > self.max_open_games:
+            self._close_oldest_game()
+
+        return self._drain()
+
+    def flush(self):
+        """
+        Closes every open game (end of stream) and returns their player-game rows
+        """
+        while self._open_games:
+            self._close_oldest_game()
+        return self._drain()
+
+    def _close_oldest_game(self):
+        game_id, players = self._open_games.popitem(last=False)
+        for player_id, counts in players.items():
+            self._finished.append((game_id, player_id, counts))
+
+    def _drain(self):
+        finished, self._finished = self._finished, []
+        return self._to_frame(finished)
+
+    def _to_frame(self, finished):
+        if not finished:
+            return pd.DataFrame(columns=['game_id', 'player_id', 'player_name', 'total_actions']
+                                + list(EVENT_COLUMNS.values()) + ['other_events'])
+
+        matrix = np.vstack([counts for _, _, counts in finished])
+        frame = pd.DataFrame({
+            'game_id': [game_id for game_id, _, _ in finished],
+            'player_id': [player_id for _, player_id, _ in finished],
+        })
+        frame['player_name'] = frame['player_id'].map(self._player_names)
+        frame['total_actions'] = matrix.sum(axis=1)
+
+        counted = list(EVENT_COLUMNS.keys())
+        for event_type, col in EVENT_COLUMNS.items():
+            frame[col] = matrix[:, event_type]
+        frame['other_events'] = frame['total_actions'] - matrix[:, counted].sum(axis=1)
+        return frame
+
+def combine_partial_counts(counts):
+    """
+    Sums rows for the same (game_id, player_id), e.g. a game closed by max_open_games that reappeared later
+    """
+    if not counts.duplicated(['game_id', 'player_id']).any():
+        return counts
+
+    count_cols = ['total_actions'] + list(EVENT_COLUMNS.values()) + ['other_events']
+    aggregations = dict({col: 'sum' for col in count_cols}, player_name='last')
+    return counts.groupby(['game_id', 'player_id'], sort=False, as_index=False).agg(aggregations)
+
+def to_player_games(counts, games=None, season_type='Regular Season'):
+    """
+    Turns aggregated counts into player_data rows with the same columns and dtypes as load_player_game_data
+    games: optional frame with game_id, game_date, season_id, season_type (from the game table)
+    """
+    df = counts.copy()
+    if games is not None:
+        games = games[['game_id', 'game_date', 'season_id', 'season_type']].copy()
+        games['game_id'] = games['game_id'].astype(str)
+        df = df.merge(games, on='game_id', how='inner')
+        if season_type is not None:
+            df = df[df['season_type'] == season_type]
+        df['game_date'] = pd.to_datetime(df['game_date'])
+    else:
+        for col in ['game_date', 'season_id', 'season_type']:
+            df[col] = pd.NaT if col == 'game_date' else None
+
+    df = df[PLAYER_GAME_COLUMNS].sort_values(['player_id', 'game_date']).reset_index(drop=True)
+
+    # Same derived shooting metrics as load_player_game_data
+    df['total_shot_attempts'] = df['made_shots'] + df['missed_shots']
+    df['shooting_efficiency'] = df['made_shots'] / df['total_shot_attempts'].replace(0, np.nan)
+
+    return compact_player_data(df, verbose=False)
+
+def aggregate_play_by_play(source, games=None, chunksize=100_000, max_open_games=64,
+                           season_type='Regular Season'):
+    """
+    Aggregates a stream of play by play events into player-game rows in bounded memory
+    """
+    aggregator = PlayByPlayAggregator(max_open_games=max_open_games)
+
+    frames = [aggregator.consume(chunk) for chunk in iter_event_chunks(source, chunksize)]
+    frames.append(aggregator.flush())
+
+    non_empty = [frame for frame in frames if not frame.empty]
+    counts = pd.concat(non_empty, ignore_index=True) if non_empty else frames[-1]
+    return to_player_games(combine_partial_counts(counts), games, season_type)
+
+def _align_to(new_rows, player_data):
+    # Casts new rows to player_data's column dtypes so concat keeps them (categoricals get any new categories,
+    # integer columns are widened first if a new value does not fit)
+    aligned = pd.DataFrame(index=new_rows.index)
+    for col, dtype in player_data.dtypes.items():
+        if col not in new_rows.columns:
+            # Engineered feature placeholders, recomputed for the new rows by the feature refresh
+            if pd.api.types.is_bool_dtype(dtype):
+                aligned[col] = False
+            elif pd.api.types.is_integer_dtype(dtype):
+                aligned[col] = np.zeros(len(new_rows), dtype=dtype)
+            else:
+                aligned[col] = pd.Series(np.nan, index=new_rows.index).astype(dtype)
+            continue
+
+        values = new_rows[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            missing = pd.Index(values.dropna().astype(str).unique()).difference(dtype.categories.astype(str))
+            if len(missing):
+                # Appending categories keeps the existing codes valid, so the column is rebuilt from them
+                dtype = pd.CategoricalDtype(dtype.categories.append(missing.astype(dtype.categories.dtype)))
+                player_data[col] = pd.Categorical.from_codes(player_data[col].cat.codes, dtype=dtype,
+                                                             validate=False)
+            values = values.astype(dtype.categories.dtype).astype(dtype)
+        elif pd.api.types.is_integer_dtype(dtype):
+            values = pd.to_numeric(values)
+            if values.size and (values.min() < np.iinfo(dtype).min or values.max() > np.iinfo(dtype).max):
+                player_data[col] = player_data[col].astype(np.int32)
+                dtype = player_data[col].dtype
+            values = values.astype(dtype)
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            values = values.astype(str).astype(dtype)
+        else:
+            values = values.astype(dtype)
+        aligned[col] = values
+    return aligned
+
+def upsert_player_games(player_data, new_games):
+    """
+    Appends new player-game rows to an existing player_data frame without touching its other rows
+    Rows for the same (game_id, player_id) are replaced by the new version. New rows take player_data's
+    dtypes, and its engineered feature columns are kept (placeholders on the new rows until the features
+    are refreshed for the affected players)
+    Returns (player_data sorted by player_id/game_date, boolean mask of the inserted rows)
+    """
+    new_rows = _align_to(compact_player_data(new_games.copy(), verbose=False), player_data)
+
+    # Only rows of the new games can be replaced, so the key comparison runs on those candidates only
+    replaced = player_data['game_id'].isin(new_rows['game_id'].unique()).to_numpy().copy()
+    if replaced.any():
+        candidates = player_data.loc[replaced, ['game_id', 'player_id']]
+        new_keys = pd.MultiIndex.from_frame(new_rows[['game_id', 'player_id']].astype(str))
+        replaced[replaced] = pd.MultiIndex.from_frame(candidates.astype(str)).isin(new_keys)
+
+    kept = player_data[~replaced] if replaced.any() else player_data
+    combined = pd.concat([kept, new_rows], ignore_index=True)
+    combined = combined.sort_values(['player_id', 'game_date'], kind='stable')
+    inserted = combined.index.to_numpy() >= len(kept)
+    return combined.reset_index(drop=True), inserted
+
+if __name__ == "__main__":
+    # Synthetic nightly slate: 12 games, ~450 events each
+    rng = np.random.default_rng(7)
+    n_games, events_per_game = 12, 450
+    game_ids = [f'00223{i:05d}' for i in range(n_games)]
+    player_pool = {str(pid): f'Player {pid}' for pid in rng.integers(200_000, 1_700_000, 300)}
+    pool_ids = list(player_pool)
+
+    def event_rows():
+        for game_id in game_ids:
+            roster = rng.choice(pool_ids, 20, replace=False)
+            for _ in range(events_per_game):
+                player_id = roster[rng.integers(0, 20)]
+                yield {
+                    'game_id': game_id,
+                    'player1_id': player_id,
+                    'player1_name': player_pool[player_id],
+                    'eventmsgtype': int(rng.choice([1, 2, 3, 4, 5, 6, 8, 10, 12]))
+                }
+
+    games = pd.DataFrame({
+        'game_id': game_ids,
+        'game_date': pd.date_range('2023-01-10', periods=n_games).strftime('%Y-%m-%d'),
+        'season_id': '22022',
+        'season_type': 'Regular Season'
+    })
+
+    start = time.perf_counter()
+    new_games = aggregate_play_by_play(event_rows(), games=games, chunksize=1_000, max_open_games=2)
+    elapsed = time.perf_counter() - start
+
+    print(f"Aggregated {n_games * events_per_game:,} events into {len(new_games):,} player-games in {elapsed:.3f}s")
+    print(new_games.head())
+
+    # Upsert into a full history sized player_data frame that already carries engineered features
+    n_history = 500_000
+    history = pd.DataFrame({
+        'game_id': rng.integers(21500001, 22201230, n_history).astype(str),
+        'game_date': pd.Timestamp('2015-10-27') + pd.to_timedelta(rng.integers(0, 2600, n_history), unit='D'),
+        'player_id': rng.choice(pool_ids, n_history),
+        'season_id': '22021',
+        'season_type': 'Regular Season'
+    })
+    history['player_name'] = history['player_id'].map(player_pool)
+    for col in PLAYER_GAME_COLUMNS[6:]:
+        history[col] = rng.poisson(5, n_history)
+    history['total_shot_attempts'] = history['made_shots'] + history['missed_shots']
+    history['shooting_efficiency'] = history['made_shots'] / history['total_shot_attempts'].replace(0, np.nan)
+    history['total_actions_7d'] = rng.random(n_history)
+    history['games_last_7_days'] = rng.integers(1, 5, n_history)
+    history = compact_player_data(history.sort_values(['player_id', 'game_date']).reset_index(drop=True),
+                                  verbose=False)
+
+    start = time.perf_counter()
+    player_data, inserted = upsert_player_games(history, new_games)
+    elapsed = time.perf_counter() - start
+    changed = [col for col in history.columns if player_data[col].dtype != history[col].dtype]
+    print(f"Upserted {inserted.sum():,} rows into {len(history):,} history rows in {elapsed:.3f}s, "
+          f"{player_data.shape[1]} columns kept, dtype changes: {changed or 'none'}")
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Position injury risk multipliers (same research based values as create_player_context_features)
+POSITION_RISK = {
+    'C': 1.3,    # Centers - highest injury risk
+    'PF': 1.2,   # Power forwards
+    'SF': 1.0,   # Small forwards - baseline
+    'SG': 0.9,   # Shooting guards
+    'PG': 0.8,   # Point guards - lowest risk
+    'F': 1.1,    # General forward
+    'G': 0.85    # General guard
+}
+
+# Raw common_player_info columns the cache depends on
+SOURCE_COLUMNS = [
+    'player_id', 'birthdate', 'height', 'weight', 'season_exp', 'position',
+    'draft_year', 'draft_round', 'draft_number', 'from_year', 'to_year'
+]
+
+# Per player static context stored in the cache
+STATIC_CONTEXT_COLUMNS = [
+    'birthdate', 'height_inches', 'weight_lbs', 'bmi', 'position_risk_factor',
+    'is_lottery_pick', 'career_span'
+]
+
+CONTEXT_FEATURES = [
+    'age_at_game', 'height_inches', 'weight_lbs', 'bmi', 'position_risk_factor',
+    'age_risk_factor', 'season_exp', 'is_lottery_pick', 'career_span'
+]
+
+DEFAULT_CACHE_PATH = '../data/processed/player_context_cache.pkl'
+
+# Bump when build_player_context changes how a column is derived; together with POSITION_RISK and
+# STATIC_CONTEXT_COLUMNS it seeds every source hash, so any change rebuilds the whole cache
+CONTEXT_DERIVATION_VERSION = 1
+
+def parse_height_inches(heights):
+    """
+    Converts "6-8" style heights to inches with vectorized string splitting (invalid -> NaN)
+    """
+    parts = heights.astype('string').str.split('-', n=1, expand=True).reindex(columns=[0, 1])
+    feet = pd.to_numeric(parts[0], errors='coerce')
+    inches = pd.to_numeric(parts[1], errors='coerce')
+    return (feet * 12 + inches).astype(np.float64)
+
+def _derivation_key():
+    # 16 character hash_pandas_object key derived from the context derivation logic
+    derivation = json.dumps([CONTEXT_DERIVATION_VERSION, POSITION_RISK, STATIC_CONTEXT_COLUMNS], sort_keys=True)
+    return hashlib.sha256(derivation.encode()).hexdigest()[:16]
+
+def _source_hashes(context_data):
+    # One uint64 per source row so changed players can be found without comparing every field
+    source = context_data.reindex(columns=SOURCE_COLUMNS).astype(str)
+    return pd.util.hash_pandas_object(source, index=False, hash_key=_derivation_key()).to_numpy()
+
+def build_player_context(context_data):
+    """
+    Builds the static per player context table from common_player_info rows
+    """
+    context_df = pd.DataFrame({'player_id': pd.to_numeric(context_data['player_id']).astype(np.int32)})
+    context_df['birthdate'] = pd.to_datetime(context_data['birthdate'], errors='coerce').to_numpy()
+
+    # Height, weight and BMI
+    context_df['height_inches'] = parse_height_inches(context_data['height']).to_numpy()
+    context_df['weight_lbs'] = pd.to_numeric(context_data['weight'], errors='coerce').to_numpy()
+    context_df['bmi'] = (context_df['weight_lbs'] * 703) / (context_df['height_inches'] ** 2)
+
+    # Position risk factor
+    context_df['position_risk_factor'] = context_data['position'].map(POSITION_RISK).fillna(1.0).to_numpy()
+
+    # Draft and career information
+    draft_number = pd.to_numeric(context_data['draft_number'], errors='coerce')
+    context_df['is_lottery_pick'] = (draft_number <= 14).astype(int).to_numpy()
+
+    from_year = pd.to_numeric(context_data['from_year'], errors='coerce')
+    to_year = pd.to_numeric(context_data['to_year'], errors='coerce')
+    context_df['career_span'] = (to_year - from_year).to_numpy()
+    context_df['from_year'] = from_year.to_numpy()
+    context_df['to_year'] = to_year.to_numpy()
+    context_df['season_exp_current'] = pd.to_numeric(context_data['season_exp'], errors='coerce').to_numpy()
+
+    return context_df
+
+def refresh_player_context(context_data, cache_path=DEFAULT_CACHE_PATH):
+    """
+    Returns the cached player context table, rebuilding only rows whose common_player_info source changed
+    (every row is rebuilt when the derivation logic changes, see CONTEXT_DERIVATION_VERSION)
+    Players no longer in context_data are dropped from the cache
+    """
+    context_data = context_data.drop_duplicates('player_id', keep='last').reset_index(drop=True)
+    source_hashes = _source_hashes(context_data)
+
+    cached = pd.read_pickle(cache_path) if cache_path and os.path.exists(cache_path) else None
+
+    if cached is not None:
+        # Object dtype keeps the uint64 hashes exact when new players introduce NaN
+        cached_hashes = cached.set_index('player_id')['source_hash'].astype(object)
+        player_ids = pd.to_numeric(context_data['player_id']).astype(np.int32)
+        previous = cached_hashes.reindex(player_ids).to_numpy()
+        changed = pd.isna(previous) | (previous != source_hashes)
+        unchanged = cached[cached['player_id'].isin(player_ids[~changed])]
+    else:
+        changed = np.ones(len(context_data), dtype=bool)
+        unchanged = None
+
+    print(f"- Player context cache: {int((~changed).sum())} players cached, {int(changed.sum())} rebuilt")
+
+    if not changed.any():
+        return unchanged.reset_index(drop=True)
+
+    rebuilt = build_player_context(context_data[changed])
+    rebuilt['source_hash'] = source_hashes[changed]
+
+    context = pd.concat([unchanged, rebuilt], ignore_index=True) if unchanged is not None else rebuilt
+    context = context.sort_values('player_id').reset_index(drop=True)
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        context.to_pickle(cache_path)
+
+    return context
+
+def season_exp_timeline(context):
+    """
+    One row per player per season (from_year .. to_year) with the experience a player had entering that season
+    Seasons start on August 1 like season_label in walk_forward_backtest; the first row is open ended
+    so games before from_year still pick up the static context
+    """
+    from_year = context['from_year'].to_numpy(dtype=np.float64)
+    to_year = context['to_year'].to_numpy(dtype=np.float64)
+    known_years = ~np.isnan(from_year) & ~np.isnan(to_year)
+
+    n_seasons = np.where(known_years, np.maximum(to_year - from_year, 0) + 1, 1).astype(int)
+    rows = np.repeat(np.arange(len(context)), n_seasons)
+    offset = np.arange(len(rows)) - np.repeat(np.cumsum(n_seasons) - n_seasons, n_seasons)
+
+    timeline = context.iloc[rows][['player_id'] + STATIC_CONTEXT_COLUMNS].reset_index(drop=True)
+
+    season_year = from_year[rows] + offset
+    timeline['season_exp'] = np.where(known_years[rows], offset, context['season_exp_current'].to_numpy()[rows])
+    effective_date = pd.to_datetime(
+        pd.DataFrame({'year': np.nan_to_num(season_year, nan=1900).astype(int), 'month': 8, 'day': 1})
+    )
+    timeline['effective_date'] = effective_date.where(offset > 0, pd.Timestamp('1900-01-01'))
+
+    return timeline.sort_values('effective_date').reset_index(drop=True)
+
+def add_context_features(player_data, context):
+    """
+    Attaches context features to every player-game with one as-of join on game_date
+    Replaces any context columns already on player_data, keeps the original row order
+    """
+    df = player_data.drop(columns=[c for c in CONTEXT_FEATURES + ['birthdate'] if c in player_data.columns])
+    df['_row'] = np.arange(len(df))
+    df['game_date'] = pd.to_datetime(df['game_date'])
+
+    timeline = season_exp_timeline(context)
+    timeline['player_id'] = timeline['player_id'].astype(np.int64)
+    left_ids = pd.to_numeric(df['player_id']).astype(np.int64)
+
+    merged = pd.merge_asof(
+        df.assign(_player_key=left_ids).sort_values('game_date'),
+        timeline.rename(columns={'player_id': '_player_key'}),
+        left_on='game_date',
+        right_on='effective_date',
+        by='_player_key',
+        direction='backward'
+    )
+    merged = merged.sort_values('_row').drop(columns=['_row', '_player_key', 'effective_date'])
+    merged.index = player_data.index
+
+    # Age at game date and age based risk factor
+    merged['age_at_game'] = (merged['game_date'] - merged['birthdate']).dt.days / 365.25
+    merged['age_risk_factor'] = np.where(
+        merged['age_at_game'] < 25, 0.9,  # Young players - slightly lower risk
+        np.where(merged['age_at_game'] < 30, 1.0,  # Prime years - baseline
+                 np.where(merged['age_at_game'] < 35, 1.2, 1.4))  # Older players - higher risk
+    )
+
+    return merged
+
+if __name__ == "__main__":
+    # Synthetic common_player_info rows and a full league sized player-game frame
+    rng = np.random.default_rng(11)
+    n_players, n_rows = 450, 500_000
+    player_ids = rng.choice(np.arange(1_000, 1_700_000), n_players, replace=False)
+    from_years = rng.integers(2003, 2022, n_players)
+    context_data = pd.DataFrame({
+        'player_id': player_ids.astype(str),
+        'birthdate': pd.to_datetime('1985-01-01') + pd.to_timedelta(rng.integers(0, 5_000, n_players), unit='D'),
+        'height': [f"{rng.integers(6, 8)}-{rng.integers(0, 12)}" for _ in range(n_players)],
+        'weight': rng.integers(170, 280, n_players).astype(str),
+        'season_exp': 2023 - from_years,
+        'position': rng.choice(['Guard', 'Forward', 'Center', 'PG', 'SF', 'C'], n_players),
+        'draft_year': from_years,
+        'draft_round': rng.integers(1, 3, n_players),
+        'draft_number': rng.integers(1, 61, n_players),
+        'from_year': from_years,
+        'to_year': 2023
+    })
+    player_data = pd.DataFrame({
+        'player_id': rng.choice(player_ids, n_rows).astype(np.int32),
+        'game_date': pd.to_datetime('2015-10-27') + pd.to_timedelta(rng.integers(0, 2800, n_rows), unit='D')
+    }).sort_values(['player_id', 'game_date']).reset_index(drop=True)
+
+    cache_path = os.path.join(tempfile.mkdtemp(), 'player_context_cache.pkl')
+
+    start = time.perf_counter()
+    context = refresh_player_context(context_data, cache_path)
+    features = add_context_features(player_data, context)
+    print(f"Cold build + as-of join: {time.perf_counter() - start:.2f}s")
+
+    # Two players get updated weights, everything else comes from the cache
+    context_data.loc[:1, 'weight'] = '300'
+    start = time.perf_counter()
+    context = refresh_player_context(context_data, cache_path)
+    features = add_context_features(player_data, context)
+    print(f"Incremental refresh + as-of join: {time.perf_counter() - start:.2f}s")
+
+    print(features[['player_id'] + CONTEXT_FEATURES].head().round(2).to_string(index=False))
+    os.remove(cache_path)
@@ -0,0 +1,114 @@
+import time
+import numpy as np
+import pandas as pd
+
+# Repeated string identifiers stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['game_id', 'player_name', 'season_id', 'season_type', 'position', 'gap_type']
+
+# Numeric identifiers stored as int32 codes
+ID_COLUMNS = ['player_id']
+
+# Per game event counts from the play by play aggregation (always >= 0)
+COUNT_COLUMNS = [
+    'total_actions', 'made_shots', 'missed_shots', 'free_throws', 'rebounds',
+    'fouls', 'turnovers', 'substitutions', 'other_events', 'total_shot_attempts'
+]
+
+def memory_usage_mb(df):
+    """
+    Returns the deep memory usage of a dataframe in megabytes
+    """
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def downcast_integer(series):
+    """
+    Downcasts an integer like series to int16 or int32
+    Series with missing values are kept as float32 so NaN survives
+    """
+    if series.isna().any():
+        return series if series.dtype == np.float32 else series.astype(np.float32)
+
+    values = series.to_numpy()
+    if values.size and values.min() >= np.iinfo(np.int16).min and values.max() <= np.iinfo(np.int16).max:
+        target = np.int16
+    else:
+        target = np.int32
+    return series if series.dtype == target else series.astype(target)
+
+def compact_player_data(df, verbose=True):
+    """
+    Converts a player-game frame to a compact dtype layout in place
+    IDs and names become categoricals or int32 codes, counts become int16/int32 and ratios float32
+    Columns already in their compact dtype are left untouched so this is cheap to call repeatedly
+    """
+    before_mb = memory_usage_mb(df) if verbose else None
+
+    # Identifiers and names
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col in ID_COLUMNS:
+        if col in df.columns and df[col].dtype != np.int32:
+            ids = pd.to_numeric(df[col], errors='coerce')
+            # Leaves non numeric IDs alone rather than silently dropping them
+            if ids.notna().all():
+                df[col] = ids.astype(np.int32)
+
+    # Event counts (int32 counts are checked too, so counts from the SQL load and from the streaming
+    # aggregator end up with the same dtype)
+    for col in COUNT_COLUMNS:
+        if col in df.columns and df[col].dtype != np.int16:
+            df[col] = downcast_integer(df[col])
+
+    # Everything else numeric: ratios/rolling features to float32, flags and counters to small ints
+    for col in df.columns:
+        if col in COUNT_COLUMNS or col in ID_COLUMNS:
+            continue
+        dtype = df[col].dtype
+        if dtype == np.float64:
+            df[col] = df[col].astype(np.float32)
+        elif dtype == np.int64:
+            df[col] = downcast_integer(df[col])
+
+    if verbose:
+        after_mb = memory_usage_mb(df)
+        saved = (1 - after_mb / before_mb) * 100 if before_mb > 0 else 0
+        print(f"player_data memory: {before_mb:.1f} MB -> {after_mb:.1f} MB ({saved:.0f}% smaller)")
+
+    return df
+
+if __name__ == "__main__":
+    # Synthetic full league sized frame for a quick before/after measurement
+    rng = np.random.default_rng(42)
+    n_rows = 500_000
+    n_players = 450
+
+    player_ids = rng.integers(1, 1_700_000, n_players)
+    player_idx = rng.integers(0, n_players, n_rows)
+    sample = pd.DataFrame({
+        'game_id': (rng.integers(21500001, 22301230, n_rows)).astype(str),
+        'game_date': pd.to_datetime('2015-10-27') + pd.to_timedelta(rng.integers(0, 2800, n_rows), unit='D'),
+        'player_id': player_ids[player_idx].astype(str),
+        'player_name': np.array([f'Player {i}' for i in range(n_players)])[player_idx],
+        'season_id': rng.choice(['22015', '22016', '22017', '22018', '22019', '22020', '22021', '22022'], n_rows),
+        'season_type': 'Regular Season',
+        'total_actions': rng.poisson(45, n_rows),
+        'made_shots': rng.poisson(8, n_rows),
+        'missed_shots': rng.poisson(9, n_rows),
+        'rebounds': rng.poisson(7, n_rows),
+        'shooting_efficiency': rng.random(n_rows),
+    })
+
+    start = time.perf_counter()
+    sample.groupby(['player_id', 'season_id'])['total_actions'].transform('mean')
+    wide_seconds = time.perf_counter() - start
+
+    compact_player_data(sample)
+
+    start = time.perf_counter()
+    sample.groupby(['player_id', 'season_id'], observed=True)['total_actions'].transform('mean')
+    compact_seconds = time.perf_counter() - start
+
+    print(f"groupby(player_id, season_id).transform: {wide_seconds*1000:.0f} ms -> {compact_seconds*1000:.0f} ms")
+    print(sample.dtypes)
@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from static_player_feature_data import create_feature_dataframe
+
+# Decision threshold and risk tiers come from the Lambda so simulated and served risk levels always agree
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'aws'))
+from lambda_function import PREDICTION_THRESHOLD, RISK_BINS, RISK_LABELS
+
+# 30 game workload sums, reduced by the share of the window a skipped game no longer contributes
+WORKLOAD_WINDOW_GAMES = 30
+WORKLOAD_FEATURES = ['total_actions_30d', 'shooting_load_30d', 'defensive_load_30d', 'cumulative_actions_30d']
+
+# Schedule features that change with a counterfactual (everything else is copied as is)
+DEPENDENT_FEATURES = [
+    'rest_days_since_last', 'games_last_7_days', 'games_last_14_days',
+    'games_into_season', 'is_back_to_back', 'fatigue_score'
+] + WORKLOAD_FEATURES
+
+def scenario_grid(rest_days_added=range(0, 5), games_skipped=range(0, 10)):
+    """
+    Builds every (extra rest days, games skipped) combination as a scenario table
+    Scenario 0 is always the unchanged schedule and is used as the baseline
+    """
+    rest, skipped = np.meshgrid(np.asarray(rest_days_added), np.asarray(games_skipped), indexing='ij')
+    scenarios = pd.DataFrame({'rest_days_added': rest.ravel(), 'games_skipped': skipped.ravel()})
+
+    # Moves the baseline to the front (adding it if the grid does not contain it)
+    is_baseline = (scenarios['rest_days_added'] == 0) & (scenarios['games_skipped'] == 0)
+    scenarios = pd.concat([
+        pd.DataFrame({'rest_days_added': [0], 'games_skipped': [0]}),
+        scenarios[~is_baseline]
+    ], ignore_index=True)
+    scenarios.insert(0, 'scenario_id', np.arange(len(scenarios)))
+    return scenarios
+
+def _rest_deficit(rest_days):
+    # Same rest deficit term as create_fatigue_indicators (no previous game counts as fully rested)
+    return np.maximum(0, 2 - np.nan_to_num(rest_days, nan=2)) / 2
+
+def expand_scenarios(features, scenarios):
+    """
+    Expands each player row into one row per scenario and recomputes the schedule dependent features
+    Skipped games are assumed to fall inside the last 7 days, and sitting any game (or adding rest)
+    removes the back to back
+    Skipped games count as zero load games in the 30 game workload sums (WORKLOAD_FEATURES);
+    ratio and trend features built from them (e.g. performance_drop_7vs30) are copied unchanged
+    fatigue_score is shifted by the change in each term of the create_fatigue_indicators formula,
+    so the baseline scenario reproduces the input exactly
+    """
+    n_players, n_scenarios = len(features), len(scenarios)
+
+    grid = features.iloc[np.repeat(np.arange(n_players), n_scenarios)].copy()
+    grid.insert(0, 'player', grid.index)
+    grid = grid.reset_index(drop=True)
+    for col in ['scenario_id', 'rest_days_added', 'games_skipped']:
+        grid[col] = np.tile(scenarios[col].to_numpy(), n_players)
+
+    rest_added = grid['rest_days_added'].to_numpy(dtype=np.float64)
+    skipped = grid['games_skipped'].to_numpy(dtype=np.float64)
+
+    # Rest days and back to back flag
+    rest = grid['rest_days_since_last'].to_numpy(dtype=np.float64)
+    new_rest = rest + rest_added
+    grid['rest_days_since_last'] = new_rest
+    grid['is_back_to_back'] = np.where((rest_added > 0) | (skipped > 0), 0, grid['is_back_to_back'])
+
+    # Game counts (the current game always counts, so windows never drop below 1)
+    games_14 = grid['games_last_14_days'].to_numpy(dtype=np.float64)
+    grid['games_last_14_days'] = np.maximum(1, games_14 - skipped)
+
+    if 'games_last_7_days' in grid.columns:
+        games_7 = grid['games_last_7_days'].to_numpy(dtype=np.float64)
+        new_games_7 = np.maximum(1, games_7 - skipped)
+        games_7_change = new_games_7 - games_7
+        grid['games_last_7_days'] = new_games_7
+    else:
+        games_7_change = -np.minimum(skipped, np.maximum(0, games_14 - 1))
+
+    season_change = -skipped
+    if 'games_into_season' in grid.columns:
+        games_season = grid['games_into_season'].to_numpy(dtype=np.float64)
+        new_games_season = np.maximum(1, games_season - skipped)
+        season_change = new_games_season - games_season
+        grid['games_into_season'] = new_games_season
+
+    # 30 game workload windows lose the skipped games' share of the load
+    remaining_share = np.maximum(0, WORKLOAD_WINDOW_GAMES - skipped) / WORKLOAD_WINDOW_GAMES
+    for col in WORKLOAD_FEATURES:
+        if col in grid.columns:
+            grid[col] = grid[col].to_numpy(dtype=np.float64) * remaining_share
+
+    # Fatigue score: 0.3 * games_7d / 7 + 0.3 * rest_deficit + 0.4 * games_into_season / 82
+    fatigue_change = (
+        0.3 * games_7_change / 7 +
+        0.3 * (_rest_deficit(new_rest) - _rest_deficit(rest)) +
+        0.4 * season_change / 82
+    )
+    grid['fatigue_score'] = np.maximum(0, grid['fatigue_score'].to_numpy(dtype=np.float64) + fatigue_change)
+
+    return grid
+
+def simulate_rest_scenarios(model, scaler, features, selected_features, scenarios=None):
+    """
+    Scores every player x scenario combination with one scaler.transform and one predict_proba call
+    features: one row per player (index = player name, as in create_feature_dataframe)
+    Returns the scenario grid with risk_probability, risk_level and risk_delta vs the unchanged schedule
+    """
+    if scenarios is None:
+        scenarios = scenario_grid()
+
+    grid = expand_scenarios(features, scenarios)
+
+    X_scaled = scaler.transform(grid[selected_features].to_numpy())
+    risk_probabilities = model.predict_proba(X_scaled)[:, 1]
+
+    results = grid[['player', 'scenario_id', 'rest_days_added', 'games_skipped'] +
+                   [col for col in DEPENDENT_FEATURES if col in grid.columns]].copy()
+    results['risk_probability'] = risk_probabilities
+    results['risk_prediction'] = (risk_probabilities > PREDICTION_THRESHOLD).astype(int)
+    results['risk_level'] = pd.cut(risk_probabilities, bins=RISK_BINS, labels=RISK_LABELS)
+
+    # Baseline is scenario 0, the first row of every player's block
+    baseline = risk_probabilities.reshape(len(features), len(scenarios))[:, 0]
+    results['baseline_risk'] = np.repeat(baseline, len(scenarios))
+    results['risk_delta'] = results['risk_probability'] - results['baseline_risk']
+
+    return results
+
+def best_rest_plan(results, max_games_skipped=None):
+    """
+    Picks the scenario with the lowest risk for each player (optionally capping games skipped)
+    """
+    candidates = results if max_games_skipped is None else results[results['games_skipped'] <= max_games_skipped]
+    best = candidates.loc[candidates.groupby('player', sort=False)['risk_probability'].idxmin()]
+    return best[['player', 'rest_days_added', 'games_skipped', 'baseline_risk',
+                 'risk_probability', 'risk_delta', 'risk_level']].reset_index(drop=True)
+
+if __name__ == "__main__":
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import RobustScaler
+
+    # League sized roster: the five static profiles plus jittered copies (500 players)
+    base = create_feature_dataframe()
+    rng = np.random.default_rng(42)
+    n_players = 500
+    roster = base.iloc[rng.integers(0, len(base), n_players)].copy()
+    roster = roster * rng.normal(1, 0.05, size=roster.shape)
+    roster['games_last_14_days'] = roster['games_last_14_days'].round()
+    roster['is_back_to_back'] = (rng.random(n_players) < 0.2).astype(int)
+    roster.index = [f'Player {i}' for i in range(n_players)]
+    selected_features = list(base.columns)
+
+    # Stand in model fitted on synthetic labels driven by fatigue and schedule density
+    X_train = roster.sample(5_000, replace=True, random_state=0)
+    logits = 6 * (X_train['fatigue_score'] - 0.6) + 0.3 * (X_train['games_last_14_days'] - 11) - 1.5
+    y_train = (rng.random(len(X_train)) < 1 / (1 + np.exp(-logits))).astype(int)
+    scaler = RobustScaler().fit(X_train[selected_features].to_numpy())
+    model = LogisticRegression(max_iter=1000).fit(scaler.transform(X_train[selected_features].to_numpy()), y_train)
+
+    scenarios = scenario_grid(rest_days_added=range(0, 5), games_skipped=range(0, 10))
+
+    start = time.perf_counter()
+    results = simulate_rest_scenarios(model, scaler, roster, selected_features, scenarios)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {n_players} players x {len(scenarios)} scenarios ({len(results):,} rows) in {elapsed:.3f}s")
+    print(results[results['player'] == 'Player 0'].head(10).round(3).to_string(index=False))
+    print()
+    print(best_rest_plan(results, max_games_skipped=2).head(10).round(3).to_string(index=False))
@@ -0,0 +1,267 @@
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+DEFAULT_DB_PATH = '../data/raw/nba.sqlite'
+DEFAULT_CACHE_DIR = '../data/query_cache'
+SQL_LIBRARIES = ['../sql/EDA.sql', '../sql/feature_engineering.sql']
+
+# {table}, {player_id}, {player_ids} style placeholders used in the .sql files
+PLACEHOLDER_PATTERN = re.compile(r'\{(\w+)\}')
+
+def _slugify(text):
+    return re.sub(r'[^a-z0-9]+', '_', text.lower()).strip('_')
+
+def parse_sql_library(path):
+    """
+    Splits an annotated .sql file into named queries
+    Section banners (-- ==== / -- TITLE / -- ====) give the section, the comment line right before a
+    statement gives its description and name (e.g. "-- Games per year analysis" -> games_per_year_analysis)
+    Returns {name: {'section', 'description', 'sql', 'placeholders', 'source'}} in file order
+    """
+    with open(path) as f:
+        lines = f.read().splitlines()
+
+    queries = {}
+    section, comments, statement = None, [], []
+    in_banner = False
+
+    def add_query():
+        sql = '\n'.join(statement).strip()
+        description = ' '.join(comments) or section or 'query'
+        name = base = _slugify(description)
+        suffix = 2
+        while name in queries:
+            name, suffix = f'{base}_{suffix}', suffix + 1
+        queries[name] = {
+            'section': section,
+            'description': description,
+            'sql': sql,
+            'placeholders': sorted(set(PLACEHOLDER_PATTERN.findall(sql))),
+            'source': os.path.basename(path)
+        }
+
+    for line in lines:
+        stripped = line.strip()
+
+        if not statement:
+            # Between statements: banners, section titles and query descriptions
+            if stripped.startswith('-- ==='):
+                in_banner = not in_banner
+                continue
+            if stripped.startswith('--'):
+                text = stripped.lstrip('-').strip()
+                if in_banner:
+                    section = text.title()
+                else:
+                    comments.append(text)
+                continue
+            if not stripped:
+                continue
+
+        statement.append(line)
+        # End of statement, ignoring trailing inline comments
+        if stripped.split('--')[0].rstrip().endswith(';'):
+            add_query()
+            comments, statement = [], []
+
+    if statement:
+        add_query()
+
+    return queries
+
+def load_query_library(paths=SQL_LIBRARIES):
+    """
+    Parses every .sql file into one {name: query} dictionary (later files win on name clashes)
+    """
+    library = {}
+    for path in paths:
+        library.update(parse_sql_library(path))
+    return library
+
+def render_query(sql, params=None):
+    """
+    Fills {placeholder} values; lists become 'a','b','c' for IN ('{player_ids}') style filters
+    Returns None if a placeholder has no value
+    """
+    params = params or {}
+    missing = [name for name in PLACEHOLDER_PATTERN.findall(sql) if name not in params]
+    if missing:
+        return None
+
+    def fill(match):
+        value = params[match.group(1)]
+        if isinstance(value, (list, tuple, set, np.ndarray, pd.Series)):
+            return "','".join(str(v) for v in value)
+        return str(value)
+
+    return PLACEHOLDER_PATTERN.sub(fill, sql)
+
+def database_fingerprint(db_path):
+    """
+    Cheap fingerprint of a SQLite file: size, modification time and the header's file change counter
+    (bytes 24-27, bumped by SQLite on every committed write) so no table data is read
+    """
+    stat = os.stat(db_path)
+    with open(db_path, 'rb') as f:
+        header = f.read(100)
+    change_counter = int.from_bytes(header[24:28], 'big') if len(header) >= 28 else 0
+    return f'{stat.st_size}-{stat.st_mtime_ns}-{change_counter}'
+
+def _cache_path(cache_dir, sql, fingerprint):
+    key = hashlib.sha256(f'{fingerprint}\n{" ".join(sql.split())}'.encode()).hexdigest()[:24]
+    return os.path.join(cache_dir, f'{key}.parquet' if PARQUET_AVAILABLE else f'{key}.pkl')
+
+def _read_cache(path):
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path)
+
+def _write_cache(df, path):
+    # Writes to a temporary file first so a crashed run never leaves a partial cache entry
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if path.endswith('.parquet'):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+def _run_read_only(db_path, sql):
+    # One read only connection per query so queries never share a cursor across threads
+    uri = f'file:{os.path.abspath(db_path)}?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    try:
+        return pd.read_sql_query(sql, conn)
+    finally:
+        conn.close()
+
+def _execute(task):
+    # A failing query is reported in the summary instead of aborting the other queries in the pool
+    start = time.perf_counter()
+    error = None
+    try:
+        if os.path.exists(task['cache_path']):
+            df, status = _read_cache(task['cache_path']), 'cached'
+        else:
+            df, status = _run_read_only(task['db_path'], task['sql']), 'executed'
+            if task['cache_path']:
+                _write_cache(df, task['cache_path'])
+    except Exception as e:
+        df, status, error = None, 'error', f'{type(e).__name__}: {e}'
+    return task['name'], df, status, time.perf_counter() - start, error
+
+def run_queries(queries, db_path=DEFAULT_DB_PATH, names=None, params=None, cache_dir=DEFAULT_CACHE_DIR,
+                max_workers=4, refresh=False):
+    """
+    Runs named queries concurrently on read only SQLite connections (sqlite3 releases the GIL while a
+    query runs, so a thread pool overlaps the heavy scans)
+    Results are cached per (SQL hash, database fingerprint), so reruns after a notebook restart only read
+    the cache; refresh=True re-executes. Queries with placeholders missing from params are skipped
+    A query that fails gets status 'error' and its message in the summary and is left out of the results
+    Returns ({name: dataframe}, run summary dataframe)
+    """
+    names = list(queries) if names is None else list(names)
+    fingerprint = database_fingerprint(db_path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    tasks, skipped = [], []
+    for name in names:
+        sql = render_query(queries[name]['sql'], params)
+        if sql is None:
+            skipped.append(name)
+            continue
+        cache_path = _cache_path(cache_dir, sql, fingerprint) if cache_dir else ''
+        if refresh and cache_path and os.path.exists(cache_path):
+            os.remove(cache_path)
+        tasks.append({'name': name, 'sql': sql, 'db_path': db_path, 'cache_path': cache_path})
+
+    if skipped:
+        print(f"Skipped {len(skipped)} queries with unfilled placeholders: {skipped}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        outputs = list(pool.map(_execute, tasks))
+
+    results = {name: df for name, df, status, _, _ in outputs if status != 'error'}
+    summary = pd.DataFrame(
+        [(name, status, len(df) if df is not None else 0, seconds, error)
+         for name, df, status, seconds, error in outputs],
+        columns=['query', 'status', 'rows', 'seconds', 'error']
+    )
+
+    failed = summary.loc[summary['status'] == 'error', 'query'].tolist()
+    if failed:
+        print(f"{len(failed)} queries failed (see the summary's error column): {failed}")
+    return results, summary
+
+if __name__ == "__main__":
+    # Synthetic database with the play_by_play, game and common_player_info columns the queries use
+    rng = np.random.default_rng(7)
+    n_games, n_events, n_players = 3_000, 400_000, 300
+    db_path = os.path.join(tempfile.mkdtemp(), 'nba.sqlite')
+
+    game = pd.DataFrame({
+        'game_id': np.arange(n_games).astype(str),
+        'game_date': (pd.Timestamp('2012-10-30') + pd.to_timedelta(rng.integers(0, 3_900, n_games), unit='D'))
+        .strftime('%Y-%m-%d 00:00:00'),
+        'season_id': '2' + pd.Series(rng.integers(2012, 2023, n_games)).astype(str),
+        'season_type': rng.choice(['Regular Season', 'Playoffs'], n_games, p=[0.9, 0.1])
+    })
+    player_ids = rng.integers(200_000, 1_700_000, n_players)
+    player_idx = rng.integers(0, n_players, n_events)
+    play_by_play = pd.DataFrame({
+        'game_id': rng.integers(0, n_games, n_events).astype(str),
+        'eventnum': np.arange(n_events),
+        'eventmsgtype': rng.integers(1, 14, n_events),
+        'eventmsgactiontype': rng.integers(0, 100, n_events),
+        'period': rng.integers(1, 5, n_events),
+        'pctimestring': '12:00',
+        'homedescription': 'event',
+        'visitordescription': None,
+        'neutraldescription': None,
+        'player1_id': player_ids[player_idx].astype(str),
+        'player1_name': [f'Player {i}' for i in player_idx],
+        'player1_team_id': rng.integers(1, 31, n_events).astype(str)
+    })
+    common_player_info = pd.DataFrame({
+        'person_id': player_ids.astype(str),
+        'display_first_last': [f'Player {i}' for i in range(n_players)],
+        'birthdate': '1995-01-01', 'height': '6-7', 'weight': '220', 'season_exp': 5, 'position': 'Forward',
+        'draft_year': 2015, 'draft_round': 1, 'draft_number': 10, 'from_year': 2015, 'to_year': 2023
+    })
+    with sqlite3.connect(db_path) as conn:
+        game.to_sql('game', conn, index=False)
+        play_by_play.to_sql('play_by_play', conn, index=False)
+        common_player_info.to_sql('common_player_info', conn, index=False)
+        conn.execute('CREATE INDEX idx_game_id ON game (game_id)')
+
+    queries = load_query_library()
+    params = {'table': 'game', 'player_id': str(player_ids[0]), 'player_ids': player_ids[:20].astype(str)}
+    cache_dir = os.path.join(os.path.dirname(db_path), 'query_cache')
+    print(f"Parsed {len(queries)} named queries, e.g. {list(queries)[:4]}")
+
+    start = time.perf_counter()
+    results, summary = run_queries(queries, db_path, params=params, cache_dir=cache_dir)
+    print(f"Cold run: {time.perf_counter() - start:.2f}s "
+          f"(summed query time {summary['seconds'].sum():.2f}s)")
+
+    start = time.perf_counter()
+    results, summary = run_queries(queries, db_path, params=params, cache_dir=cache_dir)
+    print(f"Cached run: {time.perf_counter() - start:.2f}s")
+    print(summary.drop(columns='error').head(10).round(3).to_string(index=False))
+
+    # A broken query only marks its own row, the other results are kept
+    queries['broken_query'] = {'sql': 'SELECT missing_column FROM game;'}
+    results, summary = run_queries(queries, db_path, params=params, cache_dir=cache_dir)
+    print(f"{len(results)} results kept, error: {summary.loc[summary['status'] == 'error', 'error'].iloc[0]}")
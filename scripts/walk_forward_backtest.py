@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import average_precision_score, roc_auc_score
+from sklearn.preprocessing import RobustScaler
+
+TARGET_COLUMN = 'injury_next_14_days'
+TOP_K_VALUES = [5, 10, 20]
+
+# Days after a game that its label looks at (the gap to the player's next game), used as the default embargo
+LABEL_HORIZON_DAYS = {'injury_next_14_days': 14, 'injury_next_7_days': 7}
+
+def season_label(game_dates):
+    """
+    Maps game dates to NBA season start years (Oct 2019 - Jun 2020 -> 2019)
+    """
+    game_dates = pd.to_datetime(pd.Series(game_dates))
+    return np.where(game_dates.dt.month >= 8, game_dates.dt.year, game_dates.dt.year - 1)
+
+def generate_walk_forward_folds(game_dates, freq='season', min_train_periods=2, max_train_periods=None,
+                                embargo_days=LABEL_HORIZON_DAYS[TARGET_COLUMN]):
+    """
+    Builds rolling origin folds from game_date
+    Each fold trains on every period before it (or the last max_train_periods) and tests on the next period
+    Training rows within embargo_days of the test period's first game are dropped, since their labels are
+    built from games inside the test window (set it to the label horizon)
+    freq: 'season' (NBA season) or 'month'
+    """
+    game_dates = pd.to_datetime(pd.Series(game_dates)).reset_index(drop=True)
+    if freq == 'season':
+        periods = pd.Series(season_label(game_dates))
+    elif freq == 'month':
+        periods = game_dates.dt.to_period('M').astype(str)
+    else:
+        raise ValueError(f"Unknown fold frequency: {freq}")
+
+    ordered_periods = sorted(periods.unique())
+    period_codes = periods.map({p: i for i, p in enumerate(ordered_periods)}).to_numpy()
+
+    folds = []
+    for k in range(min_train_periods, len(ordered_periods)):
+        first = 0 if max_train_periods is None else max(0, k - max_train_periods)
+        test_idx = np.flatnonzero(period_codes == k)
+        train_end = game_dates[test_idx].min() - pd.Timedelta(days=embargo_days)
+        in_window = (period_codes >= first) & (period_codes < k)
+        train_idx = np.flatnonzero(in_window & (game_dates < train_end).to_numpy())
+        folds.append({
+            'fold': len(folds),
+            'test_period': str(ordered_periods[k]),
+            'train_start': str(ordered_periods[first]),
+            'train_idx': train_idx,
+            'test_idx': test_idx,
+            'n_embargoed': int(in_window.sum() - len(train_idx))
+        })
+    return folds
+
+def top_k_recall(y_true, y_prob, k_values=TOP_K_VALUES):
+    """
+    Share of actual injuries captured in the top k% of risk scores (one sort for all k)
+    """
+    order = np.argsort(-y_prob, kind='stable')
+    captured = np.cumsum(y_true[order])
+    total = captured[-1] if len(captured) else 0
+
+    recalls = {}
+    for k in k_values:
+        top_k_size = int(len(y_true) * k / 100)
+        recalls[f'top_{k}_recall'] = captured[top_k_size - 1] / total if top_k_size > 0 and total > 0 else np.nan
+    return recalls
+
+def fold_metrics(y_true, y_prob):
+    """
+    ROC-AUC, PR-AUC and top-k recall for one fold
+    """
+    has_both_classes = 0 < y_true.sum() < len(y_true)
+    metrics = {
+        'roc_auc': roc_auc_score(y_true, y_prob) if has_both_classes else np.nan,
+        'pr_auc': average_precision_score(y_true, y_prob) if has_both_classes else np.nan,
+        'positive_rate': float(y_true.mean()) if len(y_true) else np.nan
+    }
+    metrics.update(top_k_recall(y_true, y_prob))
+    return metrics
+
+def _run_fold(task):
+    """
+    Trains and scores one fold inside a worker process
+    Feature matrices are opened memory-mapped so workers share the same pages instead of pickled copies
+    """
+    X = np.load(task['X_path'], mmap_mode='r')
+    y = np.load(task['y_path'], mmap_mode='r')
+
+    train_idx, test_idx = task['train_idx'], task['test_idx']
+    start = time.perf_counter()
+
+    # Same RobustScaler preprocessing as 03_modeling, fit on the training window only
+    scaler = RobustScaler()
+    X_train = scaler.fit_transform(X[train_idx])
+    X_test = scaler.transform(X[test_idx])
+
+    model = clone(task['model'])
+    model.fit(X_train, y[train_idx])
+    y_prob = model.predict_proba(X_test)[:, 1]
+
+    result = {
+        'fold': task['fold'],
+        'test_period': task['test_period'],
+        'train_start': task['train_start'],
+        'n_train': int(len(train_idx)),
+        'n_embargoed': task['n_embargoed'],
+        'n_test': int(len(test_idx)),
+        'fit_seconds': time.perf_counter() - start
+    }
+    result.update(fold_metrics(np.asarray(y[test_idx]), y_prob))
+
+    # Written to a temporary file first so an interrupted run never leaves a partial fold that gets reused
+    tmp_path = f"{task['cache_path']}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(result, f, default=float)
+    os.replace(tmp_path, task['cache_path'])
+    return result
+
+def _save_array(path, array):
+    # Same temporary file + rename as the fold cache, so a half written matrix is never memory mapped
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+def _fingerprint(*arrays):
+    digest = hashlib.sha256()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+def run_walk_forward_backtest(data, feature_cols, target_col=TARGET_COLUMN, model=None,
+                              freq='season', min_train_periods=2, max_train_periods=None, embargo_days=None,
+                              cache_dir='../data/backtests', n_jobs=None):
+    """
+    Walk forward backtest: one fold per season or month, trained and scored in a process pool
+    embargo_days defaults to the target's label horizon (LABEL_HORIZON_DAYS), see generate_walk_forward_folds
+    Completed folds are cached by (data, features, target, model params, fold window) so reruns are instant
+    Returns (per fold metrics dataframe, summary dataframe)
+    """
+    if model is None:
+        model = LogisticRegression(class_weight='balanced', max_iter=1000)
+    if embargo_days is None:
+        embargo_days = LABEL_HORIZON_DAYS.get(target_col, max(LABEL_HORIZON_DAYS.values()))
+
+    data = data.sort_values('game_date').reset_index(drop=True)
+    X = data[feature_cols].replace([np.inf, -np.inf], np.nan).fillna(0).to_numpy(dtype=np.float32)
+    y = data[target_col].to_numpy(dtype=np.int8)
+
+    # Shared memory mapped inputs, written once per dataset version
+    data_key = _fingerprint(X, y, data['game_date'].to_numpy(dtype='datetime64[ns]'))[:16]
+    matrix_dir = os.path.join(cache_dir, 'matrices')
+    fold_dir = os.path.join(cache_dir, 'folds')
+    os.makedirs(matrix_dir, exist_ok=True)
+    os.makedirs(fold_dir, exist_ok=True)
+
+    X_path = os.path.join(matrix_dir, f'X_{data_key}.npy')
+    y_path = os.path.join(matrix_dir, f'y_{data_key}.npy')
+    if not os.path.exists(X_path):
+        _save_array(y_path, y)
+        _save_array(X_path, X)
+
+    config = json.dumps({
+        'data': data_key,
+        'features': list(feature_cols),
+        'target': target_col,
+        'model': type(model).__name__,
+        'params': {k: repr(v) for k, v in sorted(model.get_params().items())},
+        'freq': freq,
+        'max_train_periods': max_train_periods,
+        'embargo_days': embargo_days
+    }, sort_keys=True)
+
+    folds = generate_walk_forward_folds(data['game_date'], freq, min_train_periods, max_train_periods, embargo_days)
+
+    results, pending = [], []
+    for fold in folds:
+        fold_key = hashlib.sha256(
+            f"{config}|{fold['train_start']}|{fold['test_period']}".encode()
+        ).hexdigest()[:24]
+        cache_path = os.path.join(fold_dir, f'{fold_key}.json')
+
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                results.append(json.load(f))
+        else:
+            pending.append(dict(fold, model=model, X_path=X_path, y_path=y_path, cache_path=cache_path))
+
+    print(f"Walk forward backtest: {len(folds)} folds ({len(results)} cached, {len(pending)} to run)")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            results.extend(pool.map(_run_fold, pending))
+
+    fold_results = pd.DataFrame(results).sort_values('fold').reset_index(drop=True)
+
+    metric_cols = ['roc_auc', 'pr_auc'] + [f'top_{k}_recall' for k in TOP_K_VALUES]
+    summary = fold_results[metric_cols].agg(['mean', 'std', 'min', 'max']).T
+
+    return fold_results, summary
+
+if __name__ == "__main__":
+    modeling_path = '../data/processed/modeling_data.csv'
+
+    if os.path.exists(modeling_path):
+        data = pd.read_csv(modeling_path, parse_dates=['game_date'])
+        feature_cols = [c for c in data.columns if c not in
+                        ['player_id', 'player_name', 'game_date', 'injury_next_14_days', 'injury_next_7_days',
+                         'injury_severity', 'will_have_injury_7d', 'will_have_injury_14d', 'days_to_next_game']]
+    else:
+        # Synthetic stand in with the same shape as the modeling dataset
+        rng = np.random.default_rng(42)
+        n_rows = 12_000
+        data = pd.DataFrame(rng.normal(size=(n_rows, 20)), columns=[f'feature_{i}' for i in range(20)])
+        data['game_date'] = pd.to_datetime('2015-10-27') + pd.to_timedelta(rng.integers(0, 2800, n_rows), unit='D')
+        risk = 1 / (1 + np.exp(-(data['feature_0'] + 0.5 * data['feature_1'] - 3.5)))
+        data[TARGET_COLUMN] = (rng.random(n_rows) < risk).astype(int)
+        feature_cols = [f'feature_{i}' for i in range(20)]
+
+    start = time.perf_counter()
+    fold_results, summary = run_walk_forward_backtest(data, feature_cols)
+    print(f"Completed in {time.perf_counter() - start:.2f}s")
+    print(fold_results[['test_period', 'n_train', 'n_embargoed', 'n_test', 'roc_auc', 'pr_auc', 'top_10_recall']].round(3))
+    print(summary.round(3))